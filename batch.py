@@ -0,0 +1,219 @@
+"""
+Build several contracts of CONTRACTS_DIRECTORY at once.
+
+The inheritance graph is planned from the %inherits headers of the contracts
+only, then the contracts contributing to the requested targets are parsed in
+parallel by a pool of processes and every target is flattened into
+<name>_final.cairo. Parsed ancestors are shared between all the targets.
+build_all targets every leaf contract (a contract no other contract inherits
+from). Targets whose inheritance graph is unchanged since their last build,
+according to the manifest, are skipped.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from commons import CONTRACTS_DIRECTORY
+from search_path import FINAL_SUFFIX, get_project_contracts, get_search_path, set_search_path
+from parse_cairo_contract import parse_cairo_contract, parse_cairo_header
+from sources import get_source, register_source
+from recursive_inheritance import (
+    get_header_inherits,
+    linearize_inheritance,
+    recursive_inheritance,
+)
+from writer import get_artifact_format, set_artifact_format, write_contract
+from tree_shaking import shake_contract
+from manifest import hash_inputs, is_up_to_date, load_manifest, record_build, save_manifest
+
+# below this number of contracts starting worker processes costs more than it saves
+MIN_PARALLEL_CONTRACTS = 8
+
+
+def discover_contracts() -> list:
+    """
+    Names of the contracts of CONTRACTS_DIRECTORY, in sorted order. Contracts
+    of the other directories of the search path are only inherited.
+    """
+    return get_project_contracts()
+
+
+def parse_all_contracts(names: list, workers: int = None, use_cache: bool = True) -> dict:
+    """
+    Parse the contracts in parallel, returns a dict of name to parsed contract.
+    """
+    if workers == 1 or len(names) < MIN_PARALLEL_CONTRACTS:
+        return {name: parse_cairo_contract(name, use_cache) for name in names}
+
+    parsed_contracts = dict()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(get_search_path(), get_artifact_format()),
+    ) as pool:
+        parsed = pool.map(parse_contract_and_source, names, repeat(use_cache), chunksize=8)
+        for name, (contract, contract_as_string) in zip(names, parsed):
+            # the spans of the contract point into the source retained by the worker
+            register_source(contract.path, contract_as_string)
+            parsed_contracts[name] = contract
+    return parsed_contracts
+
+
+def init_worker(search_path: list, artifact_format: str):
+    # the workers resolve the contracts and cache their parse like this process
+    set_search_path(search_path)
+    set_artifact_format(artifact_format)
+
+
+def parse_contract_and_source(contract_name: str, use_cache: bool = True):
+    contract = parse_cairo_contract(contract_name, use_cache)
+    return contract, get_source(contract.path)
+
+
+def read_headers(names: list) -> dict:
+    return {name: parse_cairo_header(name) for name in names}
+
+
+def get_leaf_contracts(headers: dict) -> list:
+    inherited = {
+        parent
+        for header in headers.values()
+        for parent in header["inherits"]
+    }
+    return sorted(name for name in headers if name not in inherited)
+
+
+def get_contributing_contracts(targets: list, headers: dict) -> set:
+    """
+    Contracts of the inheritance graphs of the targets, from their headers.
+    """
+    get_inherits = get_header_inherits(headers)
+    contributing = set()
+    for target in targets:
+        contributing.update(linearize_inheritance(target, get_inherits))
+    return contributing
+
+
+def get_output_path(target: str) -> str:
+    return f"{CONTRACTS_DIRECTORY}/{target}{FINAL_SUFFIX}.cairo"
+
+
+def get_target_inputs(
+    target: str,
+    headers: dict,
+    parsed_contracts: dict = None,
+    tree_shake: bool = False,
+    file_hashes: dict = None,
+) -> dict:
+    """
+    Hashes of the sources of the inheritance graph of a target, see manifest.py,
+    and the options changing its output. file_hashes is shared by the targets
+    of a build, see hash_inputs.
+    """
+    get_inherits = get_header_inherits(headers, parsed_contracts)
+    inputs = hash_inputs(linearize_inheritance(target, get_inherits), file_hashes)
+    if tree_shake:
+        inputs["tree_shake"] = True
+    return inputs
+
+
+def build_all(workers: int = None, use_cache: bool = True, tree_shake: bool = False) -> list:
+    """
+    Flatten every leaf contract, returns the names of the written contracts
+    in the order they were written.
+    """
+    headers = read_headers(discover_contracts())
+    return build_targets(
+        get_leaf_contracts(headers), workers, use_cache, headers=headers, tree_shake=tree_shake
+    )
+
+
+def build_targets(
+    targets: list,
+    workers: int = None,
+    use_cache: bool = True,
+    parsed_contracts: dict = None,
+    headers: dict = None,
+    tree_shake: bool = False,
+) -> list:
+    """
+    Flatten the targets in order, targets whose inheritance graph did not
+    change since their last build are skipped and only the contracts
+    contributing to the other ones are parsed. Returns the names of the
+    written contracts.
+    """
+    headers = dict() if headers is None else headers
+    parsed_contracts = dict() if parsed_contracts is None else parsed_contracts
+    manifest = load_manifest()
+    # each source is hashed once per build, for the skip check and the manifest
+    file_hashes = dict()
+
+    stale_targets = [
+        target
+        for target in targets
+        if not use_cache
+        or not is_up_to_date(
+            manifest,
+            target,
+            get_target_inputs(target, headers, tree_shake=tree_shake, file_hashes=file_hashes),
+            get_output_path(target),
+        )
+    ]
+
+    to_parse = get_contributing_contracts(stale_targets, headers) - parsed_contracts.keys()
+    parsed_contracts.update(parse_all_contracts(sorted(to_parse), workers, use_cache))
+
+    # merged ancestors shared by several targets are only merged once
+    merged_bases = dict()
+    written = list()
+    for target in stale_targets:
+        name = build_target(
+            target,
+            parsed_contracts,
+            use_cache,
+            headers,
+            manifest,
+            tree_shake,
+            merged_bases,
+            file_hashes,
+        )
+        if name:
+            written.append(name)
+    save_manifest(manifest)
+    return written
+
+
+def build_target(
+    target: str,
+    parsed_contracts: dict,
+    use_cache: bool = True,
+    headers: dict = None,
+    manifest: dict = None,
+    tree_shake: bool = False,
+    merged_bases: dict = None,
+    file_hashes: dict = None,
+) -> str:
+    """
+    Flatten a single target from the shared parsed contracts, pruning the
+    entries unreachable from its entry points with tree_shake, and record it
+    in the manifest if given. merged_bases and file_hashes are shared by the
+    targets of a build, see recursive_inheritance and hash_inputs. Returns the name of the written contract, None
+    if the flattened contract was unchanged and not written again.
+    """
+    contract_data = recursive_inheritance(
+        None,
+        target,
+        use_cache,
+        parsed_contracts=parsed_contracts,
+        headers=headers,
+        merged_bases=merged_bases,
+    )
+    if tree_shake:
+        contract_data = shake_contract(contract_data)
+    written = write_contract(contract_data, f"{target}{FINAL_SUFFIX}")
+    if manifest is not None:
+        inputs = get_target_inputs(
+            target, headers or dict(), parsed_contracts, tree_shake, file_hashes
+        )
+        record_build(manifest, target, inputs, get_output_path(target))
+    return f"{target}{FINAL_SUFFIX}" if written else None
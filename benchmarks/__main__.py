@@ -0,0 +1,163 @@
+"""
+Benchmark suite of the flattener on a synthetic hierarchy.
+
+Run from the root of the repository:
+
+    python -m benchmarks --depth 3 --fan-out 2 --diamonds 1 --output bench.json
+
+The hierarchy is generated in a temporary directory, then parsing, inheritance
+resolution, merging and writing are timed separately, as well as loading the
+artifacts of every contract in each artifact format, whose total sizes are
+also reported. Results are printed and written as JSON to track regressions
+between releases.
+"""
+
+import json
+import os
+import platform
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from commons import CONTRACTS_DIRECTORY
+from parse_cairo_contract import parse_cairo_contract
+from recursive_inheritance import (
+    get_header_inherits,
+    linearize_inheritance,
+    merge_contracts,
+    recursive_inheritance,
+)
+from writer import (
+    ARTIFACT_EXTENSIONS,
+    get_artifact_format,
+    get_artifact_path,
+    read_artifact,
+    set_artifact_format,
+    write_artifact,
+    write_contract,
+)
+
+from benchmarks.generator import TARGET, generate_hierarchy
+
+
+def time_runs(function, repeat: int, setup=None) -> dict:
+    """
+    Time repeat runs of function, setup is run untimed before each run and
+    its result given to function.
+    """
+    timings = list()
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = perf_counter()
+        function(argument)
+        timings.append(perf_counter() - start)
+    return {
+        "runs": repeat,
+        "min_s": min(timings),
+        "mean_s": sum(timings) / repeat,
+        "max_s": max(timings),
+    }
+
+
+def run_benchmarks(graph: dict, repeat: int):
+    """
+    Timings of every stage and bytes of the artifacts of the hierarchy in
+    each artifact format.
+    """
+    linearization = linearize_inheritance(TARGET, get_header_inherits())
+    parsed_contracts = {
+        name: parse_cairo_contract(name, use_cache=False) for name in linearization
+    }
+
+    def parse_all(_):
+        # parsed from scratch, nothing of the previous run is reused
+        for name in graph:
+            parse_cairo_contract(name, use_cache=False)
+
+    def resolve(_):
+        recursive_inheritance(None, TARGET, use_cache=False)
+
+    parents = [parsed_contracts[name] for name in linearization]
+    merged = merge_contracts(parents)
+
+    def load_artifacts(_):
+        for name in graph:
+            read_artifact(name)
+
+    results = {
+        "parse_cairo_contract": time_runs(parse_all, repeat),
+        "recursive_inheritance": time_runs(resolve, repeat),
+        "merge_contracts": time_runs(lambda _: merge_contracts(parents), repeat),
+        "write_contract": time_runs(lambda _: write_contract(merged, f"{TARGET}_final"), repeat),
+    }
+
+    artifact_bytes = dict()
+    default_format = get_artifact_format()
+    try:
+        for artifact_format in sorted(ARTIFACT_EXTENSIONS):
+            set_artifact_format(artifact_format)
+            for name in graph:
+                write_artifact(parsed_contracts[name], name)
+            artifact_bytes[artifact_format] = sum(
+                os.path.getsize(get_artifact_path(name)) for name in graph
+            )
+            results[f"read_artifact_{artifact_format}"] = time_runs(load_artifacts, repeat)
+    finally:
+        set_artifact_format(default_format)
+
+    return results, artifact_bytes
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark the flattener on a synthetic hierarchy")
+    parser.add_argument("--functions", type=int, default=20, help="views, externals and internal functions per contract")
+    parser.add_argument("--storage-vars", type=int, default=10)
+    parser.add_argument("--structs", type=int, default=5, help="structs and consts per contract")
+    parser.add_argument("--implicits", type=int, default=3, help="implicit arguments per function")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fan-out", type=int, default=2)
+    parser.add_argument("--diamonds", type=int, default=1, help="shared bases inherited by the whole last level")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="file the JSON results are written to")
+    args = parser.parse_args()
+
+    parameters = {
+        "functions": args.functions,
+        "storage_vars": args.storage_vars,
+        "structs": args.structs,
+        "implicits": args.implicits,
+        "depth": args.depth,
+        "fan_out": args.fan_out,
+        "diamonds": args.diamonds,
+    }
+
+    cwd = os.getcwd()
+    with TemporaryDirectory() as directory:
+        # contracts and artifacts are read and written relative to the working directory
+        os.chdir(directory)
+        try:
+            graph = generate_hierarchy(CONTRACTS_DIRECTORY, **parameters)
+            results, artifact_bytes = run_benchmarks(graph, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "contracts": len(graph),
+        "results": results,
+        "artifact_bytes": artifact_bytes,
+    }
+
+    for stage, timing in results.items():
+        print(f"{stage:<24} min {timing['min_s'] * 1000:>9.2f} ms   mean {timing['mean_s'] * 1000:>9.2f} ms")
+    for artifact_format, size in artifact_bytes.items():
+        print(f"artifacts {artifact_format:<14} {size:>10} bytes")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
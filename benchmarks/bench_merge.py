@@ -0,0 +1,68 @@
+"""
+Micro benchmark of merge_contracts on contracts with thousands of symbols.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_merge
+"""
+
+from timeit import timeit
+
+from model import Contract
+from recursive_inheritance import merge_contracts
+
+SECTIONS = ("storage", "func", "const", "structs", "view", "external")
+
+
+def generate_contract(prefix: str, number_of_symbols: int, shared: int) -> Contract:
+    """
+    Contract with number_of_symbols entries per section, the first shared
+    entries of each section have names common to every generated contract.
+    """
+    def name(section, i):
+        return f"{section}_{i}" if i < shared else f"{prefix}_{section}_{i}"
+
+    contract_dict = {
+        "contract": f"{prefix}.cairo",
+        "lang": ["starknet"],
+        "builtin": ["pedersen", "range_check", f"{prefix}_builtin"],
+        "inherits": [],
+        "imports": [
+            {f"package_{i}": [f"{prefix}_import_{i}", f"import_{i}"]}
+            for i in range(number_of_symbols)
+        ],
+        "constructor": None,
+    }
+    for section in SECTIONS:
+        contract_dict[section] = [
+            {
+                "name": name(section, i),
+                "inputs": {"implicits": [], "args": []},
+                "outputs": [],
+                "members": [],
+                "span": [f"{prefix}.cairo", 0, 0],
+            }
+            for i in range(number_of_symbols)
+        ]
+    return Contract.from_dict(contract_dict)
+
+
+def merge_chain(parents: list) -> Contract:
+    # the merge leaves its inputs unchanged, the same parents serve every run
+    return merge_contracts(parents)
+
+
+def main():
+    depth = 5
+    print(f"{'symbols':>8} {'depth':>6} {'time (ms)':>10}")
+    for number_of_symbols in (500, 1000, 2000, 4000):
+        parents = [
+            generate_contract(f"c{level}", number_of_symbols, number_of_symbols // 2)
+            for level in range(depth)
+        ]
+        seconds = timeit(lambda: merge_chain(parents), number=1)
+        print(f"{number_of_symbols:>8} {depth:>6} {seconds * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark of parse_contract_source on generated contracts of growing size.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_parse
+
+The time per kilobyte of source should stay flat as the contract grows,
+showing that parsing scales linearly with the size of the file. The fixed
+overhead of parsing a contract is measured on a minimal contract first.
+Every run parses from scratch, the blocks of the previous run are forgotten.
+"""
+
+from timeit import timeit
+
+from parse_cairo_contract import parse_contract_source
+from sources import forget_source
+
+from benchmarks.generator import generate_contract
+
+# file id of the parsed contracts
+FILE_ID = "<bench>"
+
+
+def parse_cold(contract: str):
+    forget_source(FILE_ID)
+    return parse_contract_source(contract, FILE_ID)
+
+
+def main():
+    contract = generate_contract("Small", functions=1, storage_vars=1, structs=0)
+    repeat = 2000
+    seconds = timeit(lambda: parse_cold(contract), number=repeat) / repeat
+    print(f"fixed overhead per contract: {seconds * 1e6:.1f} us\n")
+
+    print(f"{'functions':>9} {'size (KB)':>10} {'time (ms)':>10} {'us/KB':>8}")
+    for number_of_functions in (100, 200, 400, 800, 1600, 3200):
+        contract = generate_contract(
+            "Bench",
+            functions=number_of_functions,
+            storage_vars=number_of_functions,
+            structs=number_of_functions,
+        )
+        repeat = 3
+        seconds = timeit(lambda: parse_cold(contract), number=repeat) / repeat
+        size_kb = len(contract) / 1024
+        print(
+            f"{number_of_functions:>9} {size_kb:>10.1f} {seconds * 1000:>10.1f} {seconds * 1e6 / size_kb:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
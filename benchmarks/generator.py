@@ -0,0 +1,147 @@
+"""
+Generator of synthetic .cairo contracts and inheritance hierarchies.
+
+Generation is deterministic, the same parameters always give the same files.
+
+A hierarchy of depth d and fan out f is a tree of contracts: the target
+contract (level 0) inherits f contracts of level 1, each of them inherits f
+contracts of level 2 and so on down to level d. Each of the diamonds shared
+bases is inherited by every contract of the last level, closing as many
+diamonds as there are paths reaching it.
+"""
+
+from pathlib import Path
+
+TARGET = "Target"
+
+HEADER = """{inherits}%lang starknet
+%builtins pedersen range_check
+
+from starkware.cairo.common.cairo_builtins import HashBuiltin
+from starkware.cairo.common.uint256 import (Uint256, uint256_add, {name}_import)
+"""
+
+STRUCT = """
+struct {name}_Struct_{i}:
+    member a : felt
+    member b : felt
+end
+"""
+
+STORAGE_VAR = """
+@storage_var
+func {name}_map_{i}(key: felt) -> (res: felt):
+end
+"""
+
+CONST = """
+const {name}_constant_{i} = {i}
+"""
+
+CONSTRUCTOR = """
+@constructor
+func constructor{{{implicits}}}():
+    return ()
+end
+"""
+
+FUNCTIONS = """
+@view
+func {name}_view_{i}{{{implicits}}}(key: felt) -> (res: felt):
+    let (res) = {name}_map_{storage}.read(key)
+    return (res)
+end
+
+@external
+func {name}_external_{i}{{{implicits}}}(key: felt, value: felt):
+    {name}_map_{storage}.write(key, value)
+    return ()
+end
+
+func {name}_internal_{i}{{{implicits}}}(n: felt) -> (f: felt):
+    if n == 0:
+        return (0)
+    end
+    let f = n * {i}
+    return (f)
+end
+"""
+
+# implicit arguments of the generated functions, cycled when more are requested
+IMPLICITS = ("syscall_ptr : felt*", "pedersen_ptr : HashBuiltin*", "range_check_ptr")
+
+
+def generate_implicits(number_of_implicits: int) -> str:
+    implicits = [
+        IMPLICITS[i] if i < len(IMPLICITS) else f"implicit_{i}_ptr : felt*"
+        for i in range(number_of_implicits)
+    ]
+    return "\n    " + ",\n    ".join(implicits) + "\n    " if implicits else ""
+
+
+def generate_contract(
+    name: str,
+    functions: int = 10,
+    storage_vars: int = 5,
+    structs: int = 2,
+    implicits: int = 3,
+    inherits: list = (),
+) -> str:
+    """
+    Source of a contract defining functions views, externals and internal
+    functions each, with storage_vars storage vars, structs structs and as
+    many consts.
+    """
+    implicits_text = generate_implicits(implicits)
+    contract = [
+        HEADER.format(
+            inherits=f"%inherits {' '.join(inherits)}\n" if inherits else "",
+            name=name,
+        )
+    ]
+    contract.extend(STRUCT.format(name=name, i=i) for i in range(structs))
+    contract.extend(STORAGE_VAR.format(name=name, i=i) for i in range(max(storage_vars, 1)))
+    contract.extend(CONST.format(name=name, i=i) for i in range(structs))
+    contract.append(CONSTRUCTOR.format(implicits=implicits_text))
+    contract.extend(
+        FUNCTIONS.format(
+            name=name, i=i, storage=i % max(storage_vars, 1), implicits=implicits_text
+        )
+        for i in range(functions)
+    )
+    return "".join(contract)
+
+
+def generate_graph(depth: int = 2, fan_out: int = 2, diamonds: int = 0) -> dict:
+    """
+    Inheritance graph of a hierarchy, contract name -> inherited contract names,
+    the target contract is TARGET.
+    """
+    graph = dict()
+    shared_bases = [f"Shared{k}" for k in range(diamonds)]
+    level = [TARGET]
+    for _ in range(depth):
+        next_level = list()
+        for contract_name in level:
+            parents = [f"{contract_name}_{k}" for k in range(fan_out)]
+            graph[contract_name] = parents
+            next_level.extend(parents)
+        level = next_level
+    for contract_name in level:
+        graph[contract_name] = list(shared_bases)
+    for base in shared_bases:
+        graph[base] = []
+    return graph
+
+
+def generate_hierarchy(directory: str, depth: int = 2, fan_out: int = 2, diamonds: int = 0, **contract_options) -> dict:
+    """
+    Write the contracts of a hierarchy to directory, contract_options are
+    given to generate_contract. Returns the inheritance graph.
+    """
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    graph = generate_graph(depth, fan_out, diamonds)
+    for contract_name, parents in graph.items():
+        source = generate_contract(contract_name, inherits=parents, **contract_options)
+        Path(directory, f"{contract_name}.cairo").write_text(source)
+    return graph
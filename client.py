@@ -0,0 +1,69 @@
+"""
+Command line client of the build daemon, see daemon.py.
+
+Only sends the request and prints the answer, the parsing and merging are
+done by the daemon:
+
+python client.py A B --tree-shake
+python client.py --stop
+"""
+
+import socket
+import sys
+from argparse import ArgumentParser
+from json import dumps, loads
+
+from commons import CONTRACTS_DIRECTORY, DAEMON_SOCKET_PATH
+
+
+def send_request(request: dict, socket_path: str = DAEMON_SOCKET_PATH) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall((dumps(request) + "\n").encode())
+        with connection.makefile("rb") as answer:
+            return loads(answer.readline())
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Flatten contracts with a running build daemon")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        default=["A"],
+        help=f"contracts of {CONTRACTS_DIRECTORY} to flatten into <name>_final.cairo",
+    )
+    parser.add_argument(
+        "--tree-shake",
+        action="store_true",
+        help="only keep the entries reachable from the entry points",
+    )
+    parser.add_argument("--stop", action="store_true", help="stop the daemon")
+    args = parser.parse_args()
+
+    if args.stop:
+        request = {"command": "stop"}
+    else:
+        request = {"command": "build", "targets": args.targets, "tree_shake": args.tree_shake}
+    try:
+        response = send_request(request)
+    except OSError as error:
+        print(f"could not reach the build daemon on {DAEMON_SOCKET_PATH}: {error}", file=sys.stderr)
+        return 1
+    except ValueError:
+        # the daemon closed the connection without a valid answer
+        response = None
+    if not isinstance(response, dict):
+        print(f"invalid answer from the build daemon on {DAEMON_SOCKET_PATH}", file=sys.stderr)
+        return 1
+
+    for name in response.get("written", []):
+        print(f"{CONTRACTS_DIRECTORY}/{name}.cairo")
+    for target, error in response.get("errors", {}).items():
+        print(f"could not flatten {target}: {error}", file=sys.stderr)
+    if "error" in response:
+        print(response["error"], file=sys.stderr)
+    return 1 if response.get("errors") or "error" in response else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
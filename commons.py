@@ -1,2 +1,8 @@
 CONTRACTS_DIRECTORY = "contracts"
-ARTIFACTS_DIRECTORY = "artifacts/inheritance"
\ No newline at end of file
+ARTIFACTS_DIRECTORY = "artifacts/inheritance"
+# build manifest, next to the artifacts
+MANIFEST_PATH = "artifacts/manifest.json"
+# unix socket of the build daemon, see daemon.py
+DAEMON_SOCKET_PATH = "artifacts/daemon.sock"
+# SQLite index of the symbols of every contract, see symbols.py
+SYMBOL_DATABASE_PATH = f"{ARTIFACTS_DIRECTORY}/symbols.db"
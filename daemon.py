@@ -0,0 +1,192 @@
+"""
+Build daemon keeping parsed contracts and flattened contracts in memory.
+
+The daemon listens on the unix socket DAEMON_SOCKET_PATH for requests of one
+JSON line each and answers with one JSON line:
+
+{command: "build", targets: List[str], tree_shake: bool}
+    -> {written: List[str], errors: Dict{target: str}}
+{command: "stop"} -> {stopped: true}
+
+client.py is the command line client. Entries are kept in bounded LRU caches
+and invalidated by content: a parsed contract is reused while the cache key
+(hash of its source and the parser version) of its file is unchanged, and a
+flattened contract while the cache keys of its whole inheritance graph are.
+"""
+
+import os
+from collections import OrderedDict
+from json import dumps, loads
+from pathlib import Path
+from socketserver import StreamRequestHandler, UnixStreamServer
+
+from commons import DAEMON_SOCKET_PATH
+from batch import FINAL_SUFFIX, get_output_path, get_target_inputs
+from parse_cairo_contract import get_cache_key, parse_cairo_contract
+from recursive_inheritance import linearize_inheritance, recursive_inheritance
+from tree_shaking import shake_contract
+from writer import render_contract, write_if_changed
+from manifest import load_manifest, record_build, save_manifest
+from sources import forget_source
+from search_path import build_index, resolve_contract
+
+# default bounds of the caches, in contracts
+MAX_PARSED_CONTRACTS = 1024
+MAX_FLATTENED_CONTRACTS = 256
+
+
+class LRUCache:
+    """
+    Mapping keeping its most recently used entries. Entries are only evicted
+    by trim, so that a build never loses an entry it is still using.
+    """
+
+    def __init__(self, max_entries: int, on_evict=None):
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+
+    def trim(self):
+        while len(self.entries) > self.max_entries:
+            key, value = self.entries.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(key, value)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class BuildDaemon:
+    def __init__(
+        self,
+        use_cache: bool = True,
+        max_parsed: int = MAX_PARSED_CONTRACTS,
+        max_flattened: int = MAX_FLATTENED_CONTRACTS,
+    ):
+        self.use_cache = use_cache
+        # contract name -> parsed contract, its source is dropped with it
+        self.parsed = LRUCache(max_parsed, lambda name, contract: forget_source(contract.path))
+        # (target, tree_shake, cache keys of the graph) -> text of the flattened contract
+        self.flattened = LRUCache(max_flattened)
+        self.manifest = load_manifest()
+        self.stopped = False
+
+    def get_contract(self, name: str):
+        """
+        Parsed contract of a name, parsed again only if its source changed.
+        """
+        with open(resolve_contract(name)) as contract:
+            cache_key = get_cache_key(contract.read())
+        parsed_contract = self.parsed.get(name)
+        if parsed_contract is None or parsed_contract.cache_key != cache_key:
+            parsed_contract = parse_cairo_contract(name, self.use_cache)
+            self.parsed.put(name, parsed_contract)
+        return parsed_contract
+
+    def build_target(
+        self,
+        target: str,
+        tree_shake: bool = False,
+        merged_bases: dict = None,
+        file_hashes: dict = None,
+    ) -> str:
+        """
+        Flatten a target, returns the name of the written contract or None if
+        it was unchanged. merged_bases and file_hashes are shared by the
+        targets of a request.
+        """
+        graph = dict()
+
+        def get_inherits(name):
+            if name not in graph:
+                graph[name] = self.get_contract(name)
+            return graph[name].inherits
+
+        linearization = linearize_inheritance(target, get_inherits)
+        key = (target, tree_shake, tuple(graph[name].cache_key for name in linearization))
+        text = self.flattened.get(key)
+        if text is None:
+            merged = recursive_inheritance(
+                None, target, self.use_cache, parsed_contracts=graph, merged_bases=merged_bases
+            )
+            if tree_shake:
+                merged = shake_contract(merged)
+            text = render_contract(merged)
+            self.flattened.put(key, text)
+
+        output_path = get_output_path(target)
+        written = write_if_changed(output_path, text)
+        inputs = get_target_inputs(target, dict(), graph, tree_shake, file_hashes)
+        record_build(self.manifest, target, inputs, output_path)
+        return f"{target}{FINAL_SUFFIX}" if written else None
+
+    def handle_request(self, request: dict) -> dict:
+        command = request.get("command", "build")
+        if command == "stop":
+            self.stopped = True
+            return {"stopped": True}
+        if command != "build":
+            return {"error": f"unknown command {command}"}
+
+        # contracts may have been added, moved or removed since the last request
+        build_index()
+        merged_bases = dict()
+        file_hashes = dict()
+        written = list()
+        errors = dict()
+        for target in request.get("targets", []):
+            try:
+                name = self.build_target(
+                    target, request.get("tree_shake", False), merged_bases, file_hashes
+                )
+            except Exception as error:
+                # a contract being edited may be invalid, reported without stopping the daemon
+                errors[target] = str(error) if isinstance(error, (OSError, ValueError)) else repr(error)
+                continue
+            if name:
+                written.append(name)
+        save_manifest(self.manifest)
+        self.parsed.trim()
+        self.flattened.trim()
+        return {"written": written, "errors": errors}
+
+    def run(self, socket_path: str = DAEMON_SOCKET_PATH):
+        Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(socket_path):
+            # left over by a daemon that did not stop cleanly
+            os.unlink(socket_path)
+        server = UnixStreamServer(socket_path, DaemonRequestHandler)
+        server.daemon = self
+        print(f"build daemon listening on {socket_path}")
+        try:
+            # requests are handled one at a time, the caches are not shared between threads
+            while not self.stopped:
+                server.handle_request()
+        finally:
+            server.server_close()
+            os.unlink(socket_path)
+
+
+class DaemonRequestHandler(StreamRequestHandler):
+    def handle(self):
+        try:
+            request = loads(self.rfile.readline())
+        except ValueError as error:
+            response = {"error": f"invalid request: {error}"}
+        else:
+            try:
+                response = self.server.daemon.handle_request(request)
+            except Exception as error:
+                # the client always gets an answer
+                response = {"error": f"request failed: {error!r}"}
+        self.wfile.write((dumps(response) + "\n").encode())
@@ -0,0 +1,118 @@
+"""
+Flatten contracts held in memory, without reading or writing any file.
+
+flatten_sources takes the sources of the contracts by name, the target and
+every contract of its inheritance graph must be given, and returns the
+flattened source and model of the target:
+
+result = flatten_sources({"A": source_a, "B": source_b}, "A")
+result.source, result.contract
+
+The spans of the parsed contracts point into the given sources, retained by
+sources.py under the file id <memory>/<name>.cairo. Writing the artifacts and
+the <name>_final.cairo output is opt-in, with the sinks called on the result:
+
+flatten_sources(sources, "A", sinks=(artifact_sink, output_sink))
+
+Callers flattening again and again, like an editor on every change, keep the
+parsed contracts and merged bases between calls: an unchanged source is not
+parsed again and an unchanged ancestor stack is not merged again.
+"""
+
+from typing import NamedTuple
+
+from batch import get_output_path
+from model import Contract
+from parse_cairo_contract import get_cache_key, parse_contract_source
+from recursive_inheritance import linearize_inheritance, recursive_inheritance
+from sources import register_source
+from tree_shaking import shake_contract
+from writer import render_contract, write_artifact, write_if_changed
+
+# prefix of the file ids of the sources given in memory
+MEMORY_FILE_PREFIX = "<memory>/"
+
+
+class FlattenResult(NamedTuple):
+    source: str
+    contract: Contract
+    # parsed contracts of the inheritance graph of the target, by name
+    parsed_contracts: dict
+
+
+def get_memory_file_id(contract_name: str) -> str:
+    return f"{MEMORY_FILE_PREFIX}{contract_name}.cairo"
+
+
+def parse_source(contract_name: str, contract_as_string: str, parsed_contracts: dict) -> Contract:
+    """
+    Parsed contract of a source, reused from parsed_contracts while the
+    source is unchanged.
+    """
+    file_id = get_memory_file_id(contract_name)
+    cache_key = get_cache_key(contract_as_string)
+    contract = parsed_contracts.get(contract_name)
+    if contract is not None and contract.cache_key == cache_key and contract.path == file_id:
+        # another source of that name may have been registered since
+        register_source(file_id, contract_as_string)
+        return contract
+    contract = parse_contract_source(contract_as_string, file_id)
+    contract.cache_key = cache_key
+    parsed_contracts[contract_name] = contract
+    return contract
+
+
+def flatten_sources(
+    sources: dict,
+    target: str,
+    tree_shake: bool = False,
+    parsed_contracts: dict = None,
+    merged_bases: dict = None,
+    sinks: tuple = (),
+) -> FlattenResult:
+    """
+    Flatten a target from the sources of its inheritance graph, contract name
+    -> source text. parsed_contracts and merged_bases are caches that may be
+    kept between calls, see recursive_inheritance for merged_bases. Each sink
+    is called as sink(target, result). A contract of the graph missing from
+    sources raises a FileNotFoundError, a cyclic inheritance a ValueError.
+    """
+    parsed_contracts = dict() if parsed_contracts is None else parsed_contracts
+    graph = dict()
+
+    def get_inherits(name):
+        if name not in graph:
+            if name not in sources:
+                raise FileNotFoundError(f"Contract {name} not found in the given sources")
+            graph[name] = parse_source(name, sources[name], parsed_contracts)
+        return graph[name].inherits
+
+    linearize_inheritance(target, get_inherits)
+    contract = recursive_inheritance(
+        None, target, parsed_contracts=graph, merged_bases=merged_bases
+    )
+    if tree_shake:
+        contract = shake_contract(contract)
+
+    result = FlattenResult(render_contract(contract), contract, graph)
+    for sink in sinks:
+        sink(target, result)
+    return result
+
+
+###################
+# SINKS
+###################
+def artifact_sink(target: str, result: FlattenResult) -> None:
+    """
+    Write the artifacts of the parsed contracts of the graph, see writer.py.
+    """
+    for name, contract in result.parsed_contracts.items():
+        write_artifact(contract, name)
+
+
+def output_sink(target: str, result: FlattenResult) -> None:
+    """
+    Write the flattened source to <target>_final.cairo, unless unchanged.
+    """
+    write_if_changed(get_output_path(target), result.source)
@@ -0,0 +1,253 @@
+"""
+Single pass lexer for .cairo contracts.
+
+Walks the source once, line by line, and emits the top level blocks of the
+contract in source order:
+
+Block{
+    kind: str <- one of HEADER, IMPORT, DECORATED_FUNC, FUNC, CONST, STRUCT
+    name: str <- header keyword ("lang", "builtins", "inherits") or decorator name
+    start: int <- offset of the first character of the block
+    end: int <- offset one past the last character of the block
+    func_start: int <- offset of the "func" keyword (decorated funcs only)
+    read_end: int <- offset one past the last character read to lex the block,
+                     when the lexer read past its end (unclosed imports only)
+}
+
+Block bodies are closed by the "end" line matching their opening line, nested
+if/with/with_attr blocks inside functions are tracked so they do not close the
+function early.
+
+relex_contract lexes an edited contract from the blocks of its previous
+version: the blocks whose lexing read no edited character are kept, the
+blocks after the edit are shifted, and only the text in between is walked
+again.
+"""
+
+from bisect import bisect_left
+from typing import Iterator, NamedTuple
+
+HEADER = "header"
+IMPORT = "import"
+DECORATED_FUNC = "decorated_func"
+FUNC = "func"
+CONST = "const"
+STRUCT = "struct"
+
+# keywords opening a nested block that is closed by its own "end"
+NESTED_OPENERS = ("if", "with", "with_attr", "func", "struct", "namespace")
+
+# characters compared at once when looking for the edited region of a contract
+COMPARED_CHUNK = 4096
+
+
+class Block(NamedTuple):
+    kind: str
+    name: str
+    start: int
+    end: int
+    func_start: int = -1
+    read_end: int = -1
+
+
+def lex_contract(contract: str, pos: int = 0) -> Iterator[Block]:
+    """
+    Yield the top level blocks of a contract in source order, starting at pos
+    which must be outside of any block.
+    """
+    length = len(contract)
+    while pos < length:
+        line_end = next_line(contract, pos)
+        word, word_start = first_word(contract, pos, line_end)
+
+        if not word or word.startswith("#"):
+            pos = line_end
+        elif word.startswith("%"):
+            yield Block(HEADER, word[1:], word_start, line_end)
+            pos = line_end
+        elif word == "from":
+            end = line_end
+            read_end = -1
+            # parenthesised imports may span several lines
+            if contract.find("(", word_start, line_end) != -1:
+                closing = contract.find(")", word_start)
+                if closing != -1:
+                    end = next_line(contract, closing)
+                else:
+                    # the whole rest of the contract was read, up to its end
+                    read_end = length + 1
+            yield Block(IMPORT, "", word_start, end, read_end=read_end)
+            pos = end
+        elif word == "const":
+            yield Block(CONST, "", word_start, line_end)
+            pos = line_end
+        elif word == "struct":
+            end = find_block_end(contract, line_end)
+            yield Block(STRUCT, "", word_start, end)
+            pos = end
+        elif word.startswith("@"):
+            func_start, func_line_end = find_decorated_func(contract, line_end)
+            if func_start == -1:
+                pos = line_end
+                continue
+            end = find_block_end(contract, func_line_end)
+            yield Block(DECORATED_FUNC, word[1:], word_start, end, func_start)
+            pos = end
+        elif word == "func":
+            end = find_block_end(contract, line_end)
+            yield Block(FUNC, "", word_start, end)
+            pos = end
+        elif word == "namespace":
+            # namespaces are not flattened, skip their body entirely
+            pos = find_block_end(contract, line_end)
+        else:
+            pos = line_end
+
+
+def relex_contract(previous: str, previous_blocks: list, contract: str) -> list:
+    """
+    Blocks of contract, an edited version of previous whose blocks are
+    previous_blocks, the same as list(lex_contract(contract)).
+
+    The lexer only looks forward from its position, which is the end of the
+    last block after each block. Lexing restarts at the end of the last block
+    whose lexing read no edited character, and stops as soon as a block ends where a block
+    of previous ends in the unchanged text after the edit, the following
+    blocks being the ones of previous shifted by the length difference.
+    """
+    prefix = common_prefix_length(previous, contract)
+    suffix = common_suffix_length(previous, contract, min(len(previous), len(contract)) - prefix)
+    shift = len(contract) - len(previous)
+    # first unchanged character after the edit in previous
+    previous_edit_end = len(previous) - suffix
+
+    # the character at the end of a block is read to close it, it must be unchanged too
+    kept = bisect_left(previous_blocks, prefix, key=lambda block: block.end)
+    # so must the characters read past the end of a block, an unclosed import
+    # may be closed by the edit
+    kept = next(
+        (index for index in range(kept) if previous_blocks[index].read_end > prefix),
+        kept,
+    )
+    blocks = previous_blocks[:kept]
+    pos = blocks[-1].end if blocks else 0
+
+    for block in lex_contract(contract, pos):
+        blocks.append(block)
+        previous_end = block.end - shift
+        if previous_end < previous_edit_end:
+            continue
+        following = bisect_left(previous_blocks, previous_end, key=lambda block: block.end)
+        if following < len(previous_blocks) and previous_blocks[following].end == previous_end:
+            blocks.extend(shift_block(block, shift) for block in previous_blocks[following + 1 :])
+            break
+    return blocks
+
+
+def shift_block(block: Block, shift: int) -> Block:
+    if not shift:
+        return block
+    func_start = block.func_start + shift if block.func_start != -1 else -1
+    read_end = block.read_end + shift if block.read_end != -1 else -1
+    return Block(
+        block.kind, block.name, block.start + shift, block.end + shift, func_start, read_end
+    )
+
+
+def common_prefix_length(previous: str, contract: str) -> int:
+    # compare whole chunks first, then bisect the first chunk that differs
+    length = min(len(previous), len(contract))
+    pos = 0
+    while (
+        pos + COMPARED_CHUNK <= length
+        and previous[pos : pos + COMPARED_CHUNK] == contract[pos : pos + COMPARED_CHUNK]
+    ):
+        pos += COMPARED_CHUNK
+    low, high = pos, min(pos + COMPARED_CHUNK, length)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if previous[pos:middle] == contract[pos:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix_length(previous: str, contract: str, limit: int) -> int:
+    # same as common_prefix_length from the ends, at most limit characters
+    previous_end, contract_end = len(previous), len(contract)
+
+    def same(start, end):
+        # the last end characters of both, without the last start ones
+        return (
+            previous[previous_end - end : previous_end - start]
+            == contract[contract_end - end : contract_end - start]
+        )
+
+    pos = 0
+    while pos + COMPARED_CHUNK <= limit and same(pos, pos + COMPARED_CHUNK):
+        pos += COMPARED_CHUNK
+    low, high = pos, min(pos + COMPARED_CHUNK, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if same(pos, middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+###################
+# LEXER UTILS
+###################
+def next_line(contract: str, pos: int) -> int:
+    # offset of the first character of the next line
+    eol = contract.find("\n", pos)
+    return len(contract) if eol == -1 else eol + 1
+
+
+def first_word(contract: str, pos: int, line_end: int):
+    # first whitespace separated word of a line and its offset
+    start = pos
+    while start < line_end and contract[start] in " \t\r\n":
+        start += 1
+    end = start
+    while end < line_end and contract[end] not in " \t\r\n{(:":
+        end += 1
+    return contract[start:end], start
+
+
+def find_decorated_func(contract: str, pos: int):
+    # skip blank lines, comments and stacked decorators until the "func" line
+    length = len(contract)
+    while pos < length:
+        line_end = next_line(contract, pos)
+        word, word_start = first_word(contract, pos, line_end)
+        if word == "func":
+            return word_start, line_end
+        if word and not word.startswith("#") and not word.startswith("@"):
+            return -1, pos
+        pos = line_end
+    return -1, pos
+
+
+def find_block_end(contract: str, pos: int) -> int:
+    """
+    Offset just past the "end" keyword closing a block whose opening line
+    finishes right before pos. Returns the end of the contract if unclosed.
+    """
+    length = len(contract)
+    depth = 1
+    while pos < length:
+        line_end = next_line(contract, pos)
+        word, word_start = first_word(contract, pos, line_end)
+        if word == "end":
+            depth -= 1
+            if depth == 0:
+                return word_start + 3
+        elif word in NESTED_OPENERS:
+            line = contract[word_start:line_end].split("#")[0].rstrip()
+            if line.endswith(":"):
+                depth += 1
+        pos = line_end
+    return length
@@ -1,13 +1,123 @@
-from recursive_inheritance import recursive_inheritance
-from writer import write_contract
+from argparse import ArgumentParser
+
+from batch import build_all, build_targets
+from watch import ContractWatcher
+from daemon import BuildDaemon
 
 from commons import CONTRACTS_DIRECTORY
+from search_path import set_search_path
+from writer import ARTIFACT_EXTENSIONS, JSON_FORMAT, set_artifact_format
+import profiler
 
 def main():
-    child = dict()
-    contract_data = recursive_inheritance(child, "A")
-    write_contract(contract_data, "A_final")
+    parser = ArgumentParser(description="Flatten the inheritance of a cairo contract")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        default=["A"],
+        help=f"contracts of {CONTRACTS_DIRECTORY} to flatten into <name>_final.cairo",
+    )
+    parser.add_argument(
+        "--search-path",
+        action="append",
+        default=[],
+        metavar="DIRECTORY",
+        help=f"directory searched for inherited contracts after {CONTRACTS_DIRECTORY}, "
+        "may be given several times",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="re-parse every contract instead of reusing unchanged artifacts",
+    )
+    parser.add_argument(
+        "--artifact-format",
+        choices=sorted(ARTIFACT_EXTENSIONS),
+        default=JSON_FORMAT,
+        help="format of the cached parsed contracts, binary artifacts are smaller and faster to load",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help=f"flatten every leaf contract of {CONTRACTS_DIRECTORY}",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of processes parsing contracts, defaults to the number of cores",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and re-flatten the contracts affected by every change",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="seconds between two checks for changes with --watch",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and serve the build requests of client.py from memory",
+    )
+    parser.add_argument(
+        "--tree-shake",
+        action="store_true",
+        help="only keep the internal functions, consts, structs and storage vars "
+        "reachable from the constructor, external and view functions",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time, calls and bytes of every stage per contract",
+    )
+    parser.add_argument(
+        "--profile-output",
+        help="with --profile, also write a JSON trace of every call to this file",
+    )
+    args = parser.parse_args()
+    set_search_path(args.search_path)
+    set_artifact_format(args.artifact_format)
+
+    if not args.profile:
+        build(args)
+        return
+
+    # worker processes are not profiled, parse in this process
+    args.workers = 1
+    profiler.enable_profiling()
+    try:
+        build(args)
+    finally:
+        profiler.disable_profiling()
+        profiler.print_report()
+        if args.profile_output:
+            profiler.write_trace(args.profile_output)
+
+
+def build(args):
+    if args.daemon:
+        BuildDaemon(use_cache=not args.no_cache).run()
+        return
+
+    if args.watch:
+        ContractWatcher(
+            use_cache=not args.no_cache, workers=args.workers, tree_shake=args.tree_shake
+        ).run(args.interval)
+        return
+
+    if args.all:
+        written = build_all(args.workers, not args.no_cache, args.tree_shake)
+    else:
+        written = build_targets(
+            args.targets, args.workers, not args.no_cache, tree_shake=args.tree_shake
+        )
+    for name in written:
+        print(f"{CONTRACTS_DIRECTORY}/{name}.cairo")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
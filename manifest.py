@@ -0,0 +1,77 @@
+"""
+Build manifest, to skip the targets whose inputs did not change.
+
+{
+    target: {
+        inputs: Dict{contract name: sha256 of its source} <- whole inheritance graph of the target
+        output: str <- sha256 of the written <target>_final.cairo
+    }
+}
+
+A target is up to date when the sources of its inheritance graph hash the
+same as for its last build and its output file was not changed since.
+"""
+
+from hashlib import sha256
+from json import dumps, load
+from pathlib import Path
+
+from commons import MANIFEST_PATH
+from search_path import resolve_contract
+from parse_cairo_contract import get_parser_version
+from writer import write_if_changed
+
+
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST_PATH) as file:
+            return load(file)
+    except (OSError, ValueError):
+        return dict()
+
+
+def save_manifest(manifest: dict) -> None:
+    Path(MANIFEST_PATH).parent.mkdir(parents=True, exist_ok=True)
+    write_if_changed(MANIFEST_PATH, dumps(manifest, indent=2, sort_keys=True))
+
+
+def hash_file(path: str) -> str:
+    """
+    sha256 of a file, None if it does not exist.
+    """
+    try:
+        with open(path, "rb") as file:
+            return sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def hash_inputs(names: list, file_hashes: dict = None) -> dict:
+    """
+    Hashes of the sources of the given contracts, stamped with the parser
+    version so that a new parser rebuilds every target. file_hashes, path ->
+    hash, keeps the hashes of the files already read during a build, so that
+    the bases shared by many targets are only hashed once.
+    """
+    file_hashes = dict() if file_hashes is None else file_hashes
+    inputs = dict()
+    for name in names:
+        path = resolve_contract(name)
+        if path not in file_hashes:
+            file_hashes[path] = hash_file(path)
+        inputs[name] = file_hashes[path]
+    inputs["parser_version"] = get_parser_version()
+    return inputs
+
+
+def is_up_to_date(manifest: dict, target: str, inputs: dict, output_path: str) -> bool:
+    entry = manifest.get(target)
+    return bool(
+        entry
+        and entry["inputs"] == inputs
+        and entry["output"] == hash_file(output_path)
+    )
+
+
+def record_build(manifest: dict, target: str, inputs: dict, output_path: str) -> None:
+    manifest[target] = {"inputs": inputs, "output": hash_file(output_path)}
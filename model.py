@@ -0,0 +1,374 @@
+"""
+Typed model of a parsed contract.
+
+Contract{
+    path: str <- path of the contract, file id of its spans
+    lang: Tuple[str]
+    builtin: Tuple[str]
+    inherits: Tuple[str]
+    imports: Tuple[Import{module: str, names: Tuple[str]}]
+    storage: Tuple[StorageVar]
+    constructor: Function or None
+    external: Tuple[Function]
+    view: Tuple[Function]
+    const: Tuple[Const{name: str, span}]
+    func: Tuple[Function]
+    structs: Tuple[Struct{name: str, members: Tuple[Param], span}]
+    cache_key: str
+    extensions: Dict{section: result} <- sections of third party section parsers
+}
+
+Function/StorageVar{
+    name: str
+    implicits: Tuple[Param{name: str, type: str}]
+    args: Tuple[Param]
+    outputs: Tuple[Param]
+    span: (file_of_origin, start, end)
+}
+
+Values are never modified once built: sections and parameters are tuples, a
+merge or a tree shaking returns a new contract sharing the unchanged sections
+and the entries of its inputs, so a parsed contract can be reused by any
+number of merges without being copied.
+
+Every class is slotted and names and types are interned, to_dict/from_dict
+convert to and from the dict format of the JSON artifacts and
+to_tuple/from_tuple to and from the nested tuples of the binary artifacts.
+In the tuples the spans are only (start, end), their file id being the path
+of the contract.
+"""
+
+from sys import intern
+
+
+def intern_optional(string):
+    return None if string is None else intern(string.strip())
+
+
+def params_to_dicts(params: list) -> list:
+    return [param.to_dict() for param in params]
+
+
+def params_from_dicts(dicts: list) -> list:
+    return [Param.from_dict(param) for param in dicts or []]
+
+
+def params_to_tuples(params: list) -> tuple:
+    return tuple((param.name, param.type) for param in params)
+
+
+def params_from_tuples(tuples: tuple) -> list:
+    return [Param(name, type) for name, type in tuples]
+
+
+class Param:
+    __slots__ = ("name", "type")
+
+    def __init__(self, name: str, type: str = None):
+        self.name = intern(name.strip())
+        self.type = intern_optional(type)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "type": self.type}
+
+    @classmethod
+    def from_dict(cls, param: dict):
+        return cls(param["name"], param["type"])
+
+
+class Import:
+    __slots__ = ("module", "names")
+
+    def __init__(self, module: str, names: list):
+        self.module = intern(module)
+        self.names = tuple(intern(name) for name in names)
+
+    def to_dict(self) -> dict:
+        return {self.module: self.names}
+
+    @classmethod
+    def from_dict(cls, import_ele: dict):
+        # there will only ever be one key in this dict by definition
+        module, names = next(iter(import_ele.items()))
+        return cls(module, names)
+
+
+class Function:
+    __slots__ = ("name", "implicits", "args", "outputs", "span")
+
+    def __init__(self, name: str, implicits: list, args: list, outputs: list, span: tuple):
+        self.name = intern(name)
+        self.implicits = tuple(implicits)
+        self.args = tuple(args)
+        self.outputs = tuple(outputs)
+        self.span = tuple(span)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "inputs": {
+                "implicits": params_to_dicts(self.implicits),
+                "args": params_to_dicts(self.args),
+            },
+            "outputs": params_to_dicts(self.outputs),
+            "span": list(self.span),
+        }
+
+    @classmethod
+    def from_dict(cls, function: dict):
+        inputs = function["inputs"] or dict()
+        return cls(
+            function["name"],
+            params_from_dicts(inputs.get("implicits")),
+            params_from_dicts(inputs.get("args")),
+            params_from_dicts(function["outputs"]),
+            function["span"],
+        )
+
+    def to_tuple(self) -> tuple:
+        return (
+            self.name,
+            params_to_tuples(self.implicits),
+            params_to_tuples(self.args),
+            params_to_tuples(self.outputs),
+            self.span[1],
+            self.span[2],
+        )
+
+    @classmethod
+    def from_tuple(cls, function: tuple, file_id: str):
+        name, implicits, args, outputs, start, end = function
+        return cls(
+            name,
+            params_from_tuples(implicits),
+            params_from_tuples(args),
+            params_from_tuples(outputs),
+            (file_id, start, end),
+        )
+
+
+class StorageVar(Function):
+    __slots__ = ()
+
+
+class Const:
+    __slots__ = ("name", "span")
+
+    def __init__(self, name: str, span: tuple):
+        self.name = intern(name)
+        self.span = tuple(span)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "span": list(self.span)}
+
+    @classmethod
+    def from_dict(cls, const: dict):
+        return cls(const["name"], const["span"])
+
+    def to_tuple(self) -> tuple:
+        return (self.name, self.span[1], self.span[2])
+
+    @classmethod
+    def from_tuple(cls, const: tuple, file_id: str):
+        name, start, end = const
+        return cls(name, (file_id, start, end))
+
+
+class Struct:
+    __slots__ = ("name", "members", "span")
+
+    def __init__(self, name: str, members: list, span: tuple):
+        self.name = intern(name)
+        self.members = tuple(members)
+        self.span = tuple(span)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "members": params_to_dicts(self.members),
+            "span": list(self.span),
+        }
+
+    @classmethod
+    def from_dict(cls, struct: dict):
+        return cls(struct["name"], params_from_dicts(struct["members"]), struct["span"])
+
+    def to_tuple(self) -> tuple:
+        return (self.name, params_to_tuples(self.members), self.span[1], self.span[2])
+
+    @classmethod
+    def from_tuple(cls, struct: tuple, file_id: str):
+        name, members, start, end = struct
+        return cls(name, params_from_tuples(members), (file_id, start, end))
+
+
+# sections of a contract filled by the parser, see parse_cairo_contract
+CONTRACT_SECTIONS = (
+    "lang",
+    "builtin",
+    "inherits",
+    "imports",
+    "storage",
+    "constructor",
+    "external",
+    "view",
+    "const",
+    "func",
+    "structs",
+)
+
+
+class Contract:
+    __slots__ = (
+        "path",
+        "lang",
+        "builtin",
+        "inherits",
+        "imports",
+        "storage",
+        "constructor",
+        "external",
+        "view",
+        "const",
+        "func",
+        "structs",
+        "cache_key",
+        "extensions",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        lang: tuple,
+        builtin: tuple,
+        inherits: tuple,
+        imports: tuple,
+        storage: tuple,
+        constructor: Function,
+        external: tuple,
+        view: tuple,
+        const: tuple,
+        func: tuple,
+        structs: tuple,
+        cache_key: str = None,
+        extensions: dict = None,
+    ):
+        self.path = path
+        self.lang = tuple(intern(x) for x in lang)
+        self.builtin = tuple(intern(x) for x in builtin)
+        self.inherits = tuple(intern(x) for x in inherits)
+        self.imports = tuple(imports)
+        self.storage = tuple(storage)
+        self.constructor = constructor
+        self.external = tuple(external)
+        self.view = tuple(view)
+        self.const = tuple(const)
+        self.func = tuple(func)
+        self.structs = tuple(structs)
+        self.cache_key = cache_key
+        self.extensions = dict() if extensions is None else extensions
+
+    def replace(self, **changes):
+        """
+        New contract with the given sections replaced, sharing the others.
+        The extensions are copied, they are the only mutable section.
+        """
+        fields = {
+            "path": self.path,
+            "cache_key": self.cache_key,
+            "extensions": dict(self.extensions),
+        }
+        fields.update((section, getattr(self, section)) for section in CONTRACT_SECTIONS)
+        fields.update(changes)
+        return Contract(**fields)
+
+    def to_dict(self) -> dict:
+        return {
+            "contract": self.path,
+            "lang": self.lang,
+            "builtin": self.builtin,
+            "inherits": self.inherits,
+            "imports": [x.to_dict() for x in self.imports],
+            "storage": [x.to_dict() for x in self.storage],
+            "constructor": self.constructor.to_dict() if self.constructor else None,
+            "external": [x.to_dict() for x in self.external],
+            "view": [x.to_dict() for x in self.view],
+            "const": [x.to_dict() for x in self.const],
+            "func": [x.to_dict() for x in self.func],
+            "structs": [x.to_dict() for x in self.structs],
+            "cache_key": self.cache_key,
+            "extensions": self.extensions,
+        }
+
+    @classmethod
+    def from_dict(cls, contract_dict: dict):
+        constructor = contract_dict["constructor"]
+        return cls(
+            contract_dict["contract"],
+            contract_dict["lang"],
+            contract_dict["builtin"],
+            contract_dict["inherits"],
+            [Import.from_dict(x) for x in contract_dict["imports"]],
+            [StorageVar.from_dict(x) for x in contract_dict["storage"]],
+            Function.from_dict(constructor) if constructor else None,
+            [Function.from_dict(x) for x in contract_dict["external"]],
+            [Function.from_dict(x) for x in contract_dict["view"]],
+            [Const.from_dict(x) for x in contract_dict["const"]],
+            [Function.from_dict(x) for x in contract_dict["func"]],
+            [Struct.from_dict(x) for x in contract_dict["structs"]],
+            contract_dict.get("cache_key"),
+            contract_dict.get("extensions"),
+        )
+
+    def to_tuple(self) -> tuple:
+        return (
+            self.path,
+            tuple(self.lang),
+            tuple(self.builtin),
+            tuple(self.inherits),
+            tuple((x.module, tuple(x.names)) for x in self.imports),
+            tuple(x.to_tuple() for x in self.storage),
+            self.constructor.to_tuple() if self.constructor else None,
+            tuple(x.to_tuple() for x in self.external),
+            tuple(x.to_tuple() for x in self.view),
+            tuple(x.to_tuple() for x in self.const),
+            tuple(x.to_tuple() for x in self.func),
+            tuple(x.to_tuple() for x in self.structs),
+            self.cache_key,
+            self.extensions,
+        )
+
+    @classmethod
+    def from_tuple(cls, contract: tuple):
+        (
+            path,
+            lang,
+            builtin,
+            inherits,
+            imports,
+            storage,
+            constructor,
+            external,
+            view,
+            const,
+            func,
+            structs,
+            cache_key,
+            extensions,
+        ) = contract
+        return cls(
+            path,
+            lang,
+            builtin,
+            inherits,
+            [Import(module, names) for module, names in imports],
+            [StorageVar.from_tuple(x, path) for x in storage],
+            Function.from_tuple(constructor, path) if constructor else None,
+            [Function.from_tuple(x, path) for x in external],
+            [Function.from_tuple(x, path) for x in view],
+            [Const.from_tuple(x, path) for x in const],
+            [Function.from_tuple(x, path) for x in func],
+            [Struct.from_tuple(x, path) for x in structs],
+            cache_key,
+            extensions,
+        )
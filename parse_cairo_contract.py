@@ -12,134 +12,335 @@ Parse a .cairo contract into the following data structure:
         name: str
         inputs: List[str]
         outputs: List[str]
-        raw_text: str
-        file_of_origin: str <- name of file of origin
+        span: [file_of_origin, start, end] <- offsets of the text in the file of origin
     }
     constructor: Dict{
         inputs: List[str]
-        raw_text: str
+        span: [file_of_origin, start, end]
     }
     const: List[Dict{
         inputs: List
-        raw_text: str
+        span: [file_of_origin, start, end]
     }]
     external: List[Dict{
         name: str
         inputs: List[str]
         outputs: List[str]
-        raw_text: str
-        file_of_origin: str <- name of file of origin
+        span: [file_of_origin, start, end]
     }
     functions: List[Dict{
         name: str
         inputs: List[str]
         outputs: List[str]
-        raw_text: str
-        file_of_origin: str <- name of file of origin
+        span: [file_of_origin, start, end]
     }
 
 }
+
+The text of the spans is kept once per file by sources.py. The parser returns
+this data structure as the typed model of model.py, the dict above is the
+format of its artifacts.
+
+Each section of the data structure is filled by the parse function registered
+for it with register_section_parser, from the lexer blocks routed to the
+section. Sections are parsed in dependency order and new sections can be
+registered from outside this module, their results are kept in the
+extensions of the contract.
+
+Re-parsing an edited contract costs about the size of the edit: the lexer
+only walks again the text around the edit (see lexer.relex_contract), and
+the words and signatures of the blocks of the last parse of each file are
+kept by block text (see BlockCache), so the blocks left unchanged are only
+looked up. The section parsers still run on every block, which keeps the
+dependencies between sections, such as func skipping the names of storage,
+external and view, exact. parse_cairo_contract with use_cache=False parses
+the contract from scratch.
 """
 
 import re
+from hashlib import sha256
 from itertools import tee
-from typing import Tuple
-from writer import write_artifact
-from commons import CONTRACTS_DIRECTORY
+from typing import Callable, NamedTuple, Tuple
+from writer import write_artifact, read_artifact
+from search_path import resolve_contract
+from sources import (
+    forget_source,
+    get_blocks,
+    get_parsed_blocks,
+    register_blocks,
+    register_parsed_blocks,
+    register_source,
+)
+from model import Contract, Function, StorageVar, Const, Struct, Import, Param, CONTRACT_SECTIONS
+from lexer import lex_contract, relex_contract, HEADER, IMPORT, DECORATED_FUNC, FUNC, CONST, STRUCT
+
+# keyword of the data structure filled by each header
+header_keywords = {"lang": "lang", "builtins": "builtin", "inherits": "inherits"}
+
+# bump whenever the parsed data structure changes, invalidates every cached artifact,
+# the versions of the registered section parsers are added to it, see get_parser_version
+PARSER_VERSION = "7"
+
+# signature parsing, see parse_signature
+FUNC_KEYWORD = re.compile(r"\bfunc\b")
+OPENING_CHARS = "({["
+CLOSING_CHARS = ")}]"
+
 
-def parse_cairo_contract(contract_name):
-    contract_path = f"{CONTRACTS_DIRECTORY}/{contract_name}.cairo"
+###################
+# BLOCK CACHE
+###################
+class BlockCache(NamedTuple):
+    """
+    Parse results of the blocks of a file by (kind, block text): those of its
+    last parse, and those of the current parse, which replace them once it
+    is done so that only the results of the current blocks are kept.
+    """
+
+    previous: dict
+    current: dict
+
+    def get(self, kind: str, text: str, parse: Callable):
+        key = (kind, text)
+        result = self.current.get(key)
+        if result is None:
+            result = self.previous.get(key)
+            if result is None:
+                result = parse(text)
+            self.current[key] = result
+        return result
+
+
+###################
+# SECTION PARSERS REGISTRY
+###################
+class SectionParser(NamedTuple):
+    parse_function: Callable
+    requires: tuple
+    version: str = ""
+
+
+# section -> SectionParser, in registration order
+section_parsers = dict()
+# (block kind, block name) of the lexer -> section the block is routed to
+block_sections = dict()
+# sections in parsing order, every section after the sections it requires
+parse_order = list()
+
+
+def register_section_parser(
+    section: str,
+    parse_function: Callable,
+    requires: tuple = (),
+    blocks: tuple = (),
+    version: str = "",
+) -> None:
+    """
+    Register the parse function of a section of the data structure, replacing
+    the previous one of that section. It is called as
+
+    parse_function(current_dict, contract, matches)
+
+    with the blocks routed to the section, once the sections it requires are
+    parsed into current_dict. blocks are the (kind, name) of the lexer blocks
+    routed to the section, see lexer.py. The registered sections and their
+    version are part of the cache key of the parsed contracts, bump version
+    whenever the result of parse_function changes.
+    """
+    parsers = dict(section_parsers)
+    parsers[section] = SectionParser(parse_function, tuple(requires), str(version))
+    # checked before anything is registered
+    order = get_parse_order(parsers)
+
+    section_parsers[section] = parsers[section]
+    for block in blocks:
+        block_sections[block] = section
+    parse_order[:] = order
+
+
+def get_parse_order(parsers: dict) -> list:
+    """
+    Order the sections so that every section comes after the sections it
+    requires, otherwise keeping the registration order.
+    """
+    order = list()
+    in_progress = set()
+
+    def visit(section):
+        if section in in_progress:
+            raise ValueError(f"Cyclic requirement involving section {section}")
+        if section not in parsers:
+            raise ValueError(f"Section {section} is required but has no parser")
+        if section in order:
+            return
+        in_progress.add(section)
+        for required in parsers[section].requires:
+            visit(required)
+        in_progress.remove(section)
+        order.append(section)
+
+    for section in parsers:
+        visit(section)
+    return order
+
+
+def parse_cairo_contract(contract_name, use_cache=True):
+    contract_path = resolve_contract(contract_name)
     with open(contract_path) as contract:
         contract_as_string = contract.read()
 
-    # compile important keywords
-    # important that func is last
-    dict_of_keywords = dict(
-        {
-            "lang": {
-                "compiled": re.compile(r"%lang"),
-                "parse_function": "parse_percent_header",
-            },
-            "builtin": {
-                "compiled": re.compile(r"%builtins"),
-                "parse_function": "parse_percent_header",
-            },
-            "inherits": {
-                "compiled": re.compile(r"%inherits"),
-                "parse_function": "parse_percent_header",
-            },
-            "imports": {
-                "compiled": re.compile(r"(?<=from)(.*)(?=\n)"),
-                "parse_function": "parse_imports",
-            },
-            "storage": {
-                "compiled": re.compile("@storage_var"),
-                "parse_function": "parse_at_decorator",
-            },
-            "constructor": {
-                "compiled": re.compile("@constructor"),
-                "parse_function": "parse_constructor",
-            },
-            "external": {
-                "compiled": re.compile("@external"),
-                "parse_function": "parse_at_decorator",
-            },
-            "view": {
-                "compiled": re.compile("@view"),
-                "parse_function": "parse_at_decorator",
-            },
-            "const": {
-                "compiled": re.compile("\nconst "),
-                "parse_function": "parse_const",
-            },
-            "func": {
-                "compiled": re.compile("\nfunc "),
-                "parse_function": "parse_func",
-            },
-            "structs": {
-                "compiled": re.compile(r"(?=\bstruct\b)(.|\n)+?(?<=end)"),
-                "parse_function": "parse_structs",
-            },
-        }
-    )
+    # the artifact of the last parse is reused if the source and parser did not change
+    cache_key = get_cache_key(contract_as_string)
+    if use_cache:
+        cached_contract = read_artifact(contract_name)
+        if (
+            cached_contract
+            and cached_contract.cache_key == cache_key
+            and cached_contract.path == contract_path
+        ):
+            # spans of the artifact point into the source
+            register_source(contract_path, contract_as_string)
+            return cached_contract
+    else:
+        # neither the blocks nor their parse results of a previous parse are reused
+        forget_source(contract_path)
+
+    #the path allows to distinguish between different artifacts and is the file id of the spans
+    contract = parse_contract_source(contract_as_string, contract_path)
+    contract.cache_key = cache_key
+    write_artifact(contract, contract_name)
+    return contract
+
+
+def parse_cairo_header(contract_name) -> dict():
+    """
+    Read only the %lang, %builtins and %inherits prologue of a contract,
+    stopping at its first other line, enough to build the inheritance graph:
+
+    {lang: List[str], builtin: List[str], inherits: List[str]}
+    """
+    header = {"lang": [], "builtin": [], "inherits": []}
+    with open(resolve_contract(contract_name)) as contract:
+        for line in contract:
+            words = line.split()
+            keyword = get_prologue_keyword(words)
+            if keyword is None:
+                break
+            if keyword:
+                header[keyword].extend(words[1:])
+    return header
+
+
+def get_prologue_keyword(words: list):
+    """
+    Keyword of the data structure filled by a line of the prologue, from its
+    words, "" for a blank or comment line and None for a line ending the prologue.
+    """
+    if not words or words[0].startswith("#"):
+        return ""
+    return header_keywords.get(words[0][1:]) if words[0].startswith("%") else None
 
-    dict_of_matches = create_dict_of_matches(contract_as_string, dict_of_keywords)
 
-    dict_of_contract = create_dict_of_contract(
-        contract_as_string, dict_of_keywords, dict_of_matches
+def get_prologue_end(contract: str) -> int:
+    """
+    Offset of the first line after the prologue of a contract, the lines read
+    by parse_cairo_header.
+    """
+    pos = 0
+    while pos < len(contract):
+        eol = contract.find("\n", pos)
+        line_end = len(contract) if eol == -1 else eol + 1
+        if get_prologue_keyword(contract[pos:line_end].split()) is None:
+            break
+        pos = line_end
+    return pos
+
+
+def get_parser_version() -> str:
+    """
+    PARSER_VERSION followed by the registered sections and their versions, a
+    contract parsed with other section parsers is parsed again.
+    """
+    sections = ",".join(
+        f"{section}:{section_parsers[section].version}" for section in sorted(section_parsers)
     )
-    #Allows to distinguish between different artifacts
-    dict_of_contract["contract"] = contract_path
-    write_artifact(dict_of_contract, contract_name)
-    return dict_of_contract
+    return f"{PARSER_VERSION};{sections}"
+
+
+def get_cache_key(contract_as_string: str) -> str:
+    """
+    Hash of the source content stamped with the parser version.
+    """
+    content = f"{get_parser_version()}\n{contract_as_string}".encode()
+    return sha256(content).hexdigest()
+
 
-def create_dict_of_matches(contract: str, dict_of_keywords: dict()) -> dict():
-    dict_of_matches = dict()
+def parse_contract_source(contract_as_string: str, contract_path: str = "<source>") -> Contract:
+    """
+    Parse the source of a contract, the source is only walked once by the lexer.
+    The source is retained under contract_path, the file id of the parsed spans.
+    A new version of a source already parsed under contract_path is only
+    lexed around its edits.
+    """
+    lexed = get_blocks(contract_path)
+    register_source(contract_path, contract_as_string)
+    if lexed is None:
+        blocks = list(lex_contract(contract_as_string))
+    else:
+        blocks = relex_contract(*lexed, contract_as_string)
+    register_blocks(contract_path, contract_as_string, blocks)
+    cache = BlockCache(get_parsed_blocks(contract_path), dict())
+    contract = create_contract(contract_as_string, blocks, contract_path, cache)
+    register_parsed_blocks(contract_path, cache.current)
+    return contract
 
-    for keyword in dict_of_keywords.keys():
-        dict_of_matches[keyword] = [
-            {"start": x.start(), "finish": x.end()}
-            for x in dict_of_keywords[keyword]["compiled"].finditer(contract)
-        ]
+
+def create_dict_of_matches(blocks, cache: BlockCache = None) -> dict():
+    """
+    Sort the block stream of the lexer into the sections of the data structure.
+    The matches carry the cache of the file, see parse_block.
+    """
+    dict_of_matches = {section: [] for section in parse_order}
+    func_matches = dict_of_matches.get("func")
+
+    for block in blocks:
+        if block.kind == DECORATED_FUNC and func_matches is not None:
+            # decorated functions are also seen by the func parser which filters them out
+            func_matches.append({"start": block.func_start, "finish": block.end, "cache": cache})
+
+        section = block_sections.get((block.kind, block.name))
+        if section:
+            dict_of_matches[section].append(
+                {
+                    "start": block.start,
+                    "finish": block.end,
+                    "func_start": block.func_start,
+                    "cache": cache,
+                }
+            )
 
     return dict_of_matches
 
 
-def create_dict_of_contract(
-    contract: str, dict_of_keywords: dict(), dict_of_matches: dict()
-) -> dict():
-    # final data structure
+def create_contract(contract: str, blocks, contract_path: str, cache: BlockCache = None) -> Contract:
+    # sections of the final data structure
     dict_of_contract = dict()
+    dict_of_contract["contract"] = contract_path
+    dict_of_matches = create_dict_of_matches(blocks, cache)
 
-    # we call each parse function by name to parse different blocks of the contract
-    # all parsing is done from the absolute contract
-    for keyword in dict_of_matches.keys():
-        dict_of_contract[keyword] = eval(
-            f'{dict_of_keywords[keyword]["parse_function"]}'
-            + "(dict_of_contract, contract, dict_of_matches[keyword])"
+    # parse the sections in dependency order, all parsing is done from the absolute contract
+    for section in parse_order:
+        dict_of_contract[section] = section_parsers[section].parse_function(
+            dict_of_contract, contract, dict_of_matches[section]
         )
 
-    return dict_of_contract
+    contract_path = dict_of_contract.pop("contract")
+    extensions = {
+        section: dict_of_contract.pop(section)
+        for section in parse_order
+        if section not in CONTRACT_SECTIONS
+    }
+    return Contract(contract_path, **dict_of_contract, extensions=extensions)
 
 
 ###################
@@ -150,7 +351,7 @@ def parse_percent_header(current_dict: dict, contract: str, percent_match: re.Ma
 
     # each time we have a % appearing in the given match object we parse the block ending in \n
     for occurance in percent_match:
-        list_of_words, _ = parse_block(occurance, contract, "\n")
+        list_of_words, _ = parse_block(occurance, contract)
         percent_list.extend(list_of_words[1:])
 
     return percent_list
@@ -159,11 +360,23 @@ def parse_percent_header(current_dict: dict, contract: str, percent_match: re.Ma
 ###################
 # INHERITANCE PARSING
 ###################
+def parse_inherits_prologue(current_dict: dict, contract: str, inherits_match: re.Match) -> list:
+    """
+    Parses the %inherits lines, which must be in the prologue of the contract:
+    the builds are planned from the prologue only, see parse_cairo_header.
+    """
+    if inherits_match and inherits_match[-1]["start"] >= get_prologue_end(contract):
+        raise ValueError(
+            f"%inherits of {current_dict['contract']} must come before any other line"
+        )
+    return parse_percent_header(current_dict, contract, inherits_match)
+
+
 def parse_inherit(current_dict: dict, contract: str, starting_match: re.Match) -> list:
     inherit_list = list()
 
     for occurance in starting_match:
-        list_of_words, _ = parse_block(occurance, contract, "end")
+        list_of_words, _ = parse_block(occurance, contract)
         inherit_list.extend(list_of_words[1:-1])
     return inherit_list
 
@@ -175,10 +388,10 @@ def parse_imports(current_dict: dict, contract: str, starting_match: re.Match) -
     imports_list = list()
 
     for occurance in starting_match:
-        list_words, _ = parse_block(occurance, contract, "\n")
-        #first "word" is the module
-        dict_of_module = {list_words[0]: [repl_imp_chars(imp) for imp in list_words[2:]]}
-        imports_list.append(dict_of_module)
+        list_words, _ = parse_block(occurance, contract)
+        #first "word" is from, followed by the module
+        imported = [repl_imp_chars(imp) for imp in list_words[3:]]
+        imports_list.append(Import(list_words[1], [imp for imp in imported if imp]))
 
     return imports_list
 
@@ -186,23 +399,29 @@ def parse_imports(current_dict: dict, contract: str, starting_match: re.Match) -
 ###################
 # STORAGE+EXTERNAL+VIEW PARSING
 ###################
-def parse_at_decorator(current_dict: dict, contract: str, match: re.Match) -> list:
+def parse_storage_var(current_dict: dict, contract: str, match: re.Match) -> list:
+    return parse_at_decorator(current_dict, contract, match, StorageVar)
+
+
+def parse_at_decorator(current_dict: dict, contract: str, match: re.Match, cls=Function) -> list:
     """
     Parses the pieces of code with the "@" decorator prefix
     """
     lst = list()
     for occurance in match:
-        list_of_words, raw_text = parse_block(occurance, contract, "end")
-        # name is the third word, also strip extra chars from name
-        name = parse_name(list_of_words[2])
-        implicits = get_implicits(raw_text)
-        args = get_args(raw_text)
-        outputs = get_outputs(raw_text)
-        # TODO: add file of origin
-        data_dict = dict(
-            {"name": name, "inputs": {"implicits":implicits, "args":args}, "outputs": outputs, "raw_text": raw_text}
+        list_of_words, raw_text = parse_decorated_block(occurance, contract)
+        # name follows the func keyword, also strip extra chars from name
+        name = parse_name(list_of_words[1])
+        inputs, outputs = parse_inputs_and_outputs(raw_text, occurance.get("cache"))
+        lst.append(
+            cls(
+                name,
+                inputs["implicits"],
+                inputs["args"],
+                outputs,
+                get_span(current_dict, occurance),
+            )
         )
-        lst.append(data_dict)
 
     return lst
 
@@ -210,16 +429,17 @@ def parse_at_decorator(current_dict: dict, contract: str, match: re.Match) -> li
 ###################
 # CONSTRUCTOR PARSING
 ###################
-def parse_constructor(current_dict: dict, contract: str, constructor_match: re.Match) -> dict():
+def parse_constructor(current_dict: dict, contract: str, constructor_match: re.Match) -> Function:
     # will only ever be one but will be packaged in a list
     for occurance in constructor_match:
-        list_of_words, raw_text = parse_block(occurance, contract, "end")
+        list_of_words, raw_text = parse_decorated_block(occurance, contract)
         # name should always be constructor
-        name = parse_name(list_of_words[2])
+        name = parse_name(list_of_words[1])
         # should always have no outputs
-        inputs, outputs = parse_inputs_and_outputs(list_of_words)
-        # TODO: add file of origin
-        return {"name": name, "inputs": inputs, "outputs": outputs, "raw_text": raw_text}
+        inputs, outputs = parse_inputs_and_outputs(raw_text, occurance.get("cache"))
+        return Function(
+            name, inputs["implicits"], inputs["args"], outputs, get_span(current_dict, occurance)
+        )
 
     return None
 
@@ -231,11 +451,8 @@ def parse_const(current_dict: dict, contract: str, const_match: re.Match) -> lis
     const_list = list()
 
     for occurance in const_match:
-        const_dict = dict()
-        list_of_words, raw_text = parse_block(occurance, contract, "\n")
-        const_dict["name"] = parse_name(list_of_words[1])
-        const_dict["raw_text"] = raw_text
-        const_list.append(const_dict)
+        list_of_words, _ = parse_block(occurance, contract)
+        const_list.append(Const(parse_name(list_of_words[1]), get_span(current_dict, occurance)))
 
     return const_list
 
@@ -245,26 +462,26 @@ def parse_const(current_dict: dict, contract: str, const_match: re.Match) -> lis
 ###################
 def parse_func(current_dict: dict, contract: str, func_match: re.Match) -> list():
     func_list = list()
+    ext_and_int_funcs = {x.name for x in current_dict["external"]} | {x.name for x in current_dict["view"]}
+    storage_vars = {x.name for x in current_dict["storage"]}
 
     for occurance in func_match:
-        list_of_words, raw_text = parse_block(occurance, contract, "end")
+        list_of_words, raw_text = parse_block(occurance, contract)
         name = parse_name(list_of_words[1])
-        ext_and_int_funcs = [x.get("name") for x in current_dict["external"]] + [x.get("name") for x in current_dict["view"]]
-        if not name in [x.get("name") for x in current_dict["storage"]]:
+        if not name in storage_vars:
             if not name in ext_and_int_funcs:
                 if not name == "constructor":
-                    inputs, outputs = parse_inputs_and_outputs(list_of_words)
-                    # TODO: add file of origin
-
-                    dict_of_func = dict(
-                        {
-                            "name": name,
-                            "inputs": inputs,
-                            "outputs": outputs,
-                            "raw_text": raw_text,
-                        }
+                    inputs, outputs = parse_inputs_and_outputs(raw_text, occurance.get("cache"))
+
+                    func_list.append(
+                        Function(
+                            name,
+                            inputs["implicits"],
+                            inputs["args"],
+                            outputs,
+                            get_span(current_dict, occurance),
+                        )
                     )
-                    func_list.append(dict_of_func)
 
     return func_list
 
@@ -275,18 +492,15 @@ def parse_func(current_dict: dict, contract: str, func_match: re.Match) -> list(
 def parse_structs(current_dict: dict, contract: str, struct_match: re.Match) -> list():
     struct_list = list()
     for occurance in struct_match:
-        list_of_words, raw_text = parse_block(occurance, contract, "end")
+        list_of_words, _ = parse_block(occurance, contract)
         name = list_of_words[1].replace(":","")
         members_to_parse = filter(lambda x: x != ":" and x != "member", list_of_words[2:len(list_of_words)-1])
 
-        members = [] #{name, type}
+        members = [] #Param{name, type}
         for member in [*zip(members_to_parse, members_to_parse)]:
-            members.append({"name":member[0], "type":member[1]})
+            members.append(Param(member[0], member[1]))
 
-        dict_of_struct = dict(
-            {"name":name, "members":members, "raw_text": raw_text}
-        )
-        struct_list.append(dict_of_struct)
+        struct_list.append(Struct(name, members, get_span(current_dict, occurance)))
 
     return struct_list
 
@@ -296,18 +510,36 @@ def parse_structs(current_dict: dict, contract: str, struct_match: re.Match) ->
 ###################
 
 
-def parse_block(occurance: dict, contract: str, ending_word: str) -> Tuple[list, str]:
-    word = re.compile("[\S]+")
-    block = get_block(occurance, contract, ending_word)
-    return word.findall(block), block
+def parse_block(occurance: dict, contract: str) -> Tuple[tuple, str]:
+    block = contract[occurance["start"] : occurance["finish"]]
+    cache = occurance.get("cache")
+    if cache is None:
+        return split_block(block), block
+    return cache.get("words", block, split_block), block
 
 
-def compile_list_of_strings(list_of_strings: list()) -> list():
-    compiled_strings = list()
-    for string in list_of_strings:
-        compiled_strings.append(re.compile(string))
+def split_block(block: str) -> tuple:
+    return tuple(block.split())
 
-    return compiled_strings
+
+def parse_decorated_block(occurance: dict, contract: str) -> Tuple[tuple, str]:
+    """
+    Words and text of a decorated function from its func keyword, the
+    decorators and comments before it are left out. The span of the entry
+    still covers the whole block.
+    """
+    func_start = occurance.get("func_start", -1)
+    if func_start == -1:
+        return parse_block(occurance, contract)
+    return parse_block(
+        {"start": func_start, "finish": occurance["finish"], "cache": occurance.get("cache")},
+        contract,
+    )
+
+
+def get_span(current_dict: dict, occurance: dict) -> tuple:
+    # text of the block is not copied, only its offsets in the file of origin
+    return (current_dict["contract"], occurance["start"], occurance["finish"])
 
 
 def parse_name(word: str) -> str:
@@ -315,71 +547,123 @@ def parse_name(word: str) -> str:
     word = word.split("(")[0]
     return word
 
-def get_implicits(raw_text : str) -> list:
-    """
-    Retrieve the implicits of a function.
-    """
-    reg = re.compile("(?<={)(.|\n)*?(?=})")
-    implicits = []
-    try:
-        x = next(reg.finditer(raw_text))
-        raw_implicits = raw_text[x.start():x.end()].split(",")
-        cleaned_implicits = list(map(lambda x : x.replace("\n", "").replace(" ", ""), raw_implicits))
-        for implicit in cleaned_implicits:
-            name, type = implicit.split(":") if len(implicit.split(":")) > 1 else [implicit, None]
-            implicits.append({"name":name, "type":type})
-    except StopIteration:
-        pass
-    return implicits
-
-def get_args(raw_text : str) -> list:
-    """
-    Retrieve the arguments of a function.
-    """
-    reg = re.compile("(?<=}\()(.|\n)*?(?=\):|\)\s-)")
-    args = []
-    try:
-        x = next(reg.finditer(raw_text))
-        raw_args = raw_text[x.start():x.end()].split(",")
-        cleaned_args = list(map(lambda x : x.replace("\n", "").replace(" ", ""), raw_args))
-        for arg in cleaned_args:
-            name, type = arg.split(":") if len(arg.split(":")) > 1 else [arg, None]
-            args.append({"name":name, "type":type})
-    except StopIteration:
-        pass
-    return args
-
-def get_outputs(raw_text : str) -> list:
-    """
-    Retrieves the outputs of a function.
-    """
-    reg = re.compile("(?<=}\()(.|\n)*?(?=\):)")
-    outputs = []
-    try:
-        x = next(reg.finditer(raw_text))
-        raw_outputs = raw_text[x.start():x.end()].split("->")
-        if len(raw_outputs) == 1: # no outputs
-            return outputs
-        raw_outputs = raw_outputs[1].replace("(", "")
-        cleaned_outputs = list(map(lambda x : x.replace("\n", "").replace(" ", ""), raw_outputs))
-        for output in cleaned_outputs:
-            name, type = output.split(":") if len(output.split(":")) > 1 else [output, None]
-            outputs.append({"name":name, "type":type})
-    except StopIteration:
-        pass
-    return outputs
-
-#return block of text to be parsed
-def get_block(occurance: dict(), contract: str, ending_str: str) -> str:
-    end = re.compile(ending_str)
-    string_starting_with_keyword = contract[occurance["start"] :].lstrip("\n")
-    match = end.search(string_starting_with_keyword)
-
-    if match:
-        return string_starting_with_keyword[: match.end()]
+def parse_inputs_and_outputs(raw_text: str, cache: BlockCache = None) -> Tuple[dict, list]:
+    """
+    Retrieve the inputs (implicits and arguments) and the outputs of a function.
+    """
+    if cache is None:
+        implicits, args, outputs = parse_signature(raw_text)
     else:
-        return string_starting_with_keyword
+        implicits, args, outputs = cache.get("signature", raw_text, parse_signature)
+    return {"implicits": implicits, "args": args}, outputs
+
+def parse_signature(raw_text: str) -> Tuple[tuple, tuple, tuple]:
+    """
+    Retrieve the implicits, arguments and outputs of the signature
 
+    func name{implicits}(args) -> (outputs):
+
+    in a single left to right scan of the text, every part being optional.
+    Nested parentheses, braces and brackets (tuples, pointer types) are kept
+    in the type of their parameter and comments are skipped.
+    """
+    func = find_func_keyword(raw_text)
+    if not func:
+        return (), (), ()
+    pos = skip_name(raw_text, func.end())
+
+    implicits, args, outputs = (), (), ()
+    if raw_text.startswith("{", pos):
+        implicits, pos = parse_group(raw_text, pos)
+        pos = skip_blanks(raw_text, pos)
+    if raw_text.startswith("(", pos):
+        args, pos = parse_group(raw_text, pos)
+        pos = skip_blanks(raw_text, pos)
+    if raw_text.startswith("->", pos):
+        pos = skip_blanks(raw_text, pos + 2)
+        if raw_text.startswith("(", pos):
+            outputs, pos = parse_group(raw_text, pos)
+    return implicits, args, outputs
+
+def find_func_keyword(raw_text: str):
+    """
+    Match of the first func keyword outside of a comment, None if there is none.
+    """
+    pos = 0
+    while True:
+        func = FUNC_KEYWORD.search(raw_text, pos)
+        if not func:
+            return None
+        line_start = raw_text.rfind("\n", 0, func.start()) + 1
+        if raw_text.find("#", line_start, func.start()) == -1:
+            return func
+        # the rest of the line is a comment
+        pos = raw_text.find("\n", func.end())
+        if pos == -1:
+            return None
+
+def skip_blanks(raw_text: str, pos: int) -> int:
+    # skip whitespace and comments
+    length = len(raw_text)
+    while pos < length:
+        if raw_text[pos] == "#":
+            pos = raw_text.find("\n", pos)
+            if pos == -1:
+                return length
+        elif not raw_text[pos].isspace():
+            return pos
+        pos += 1
+    return pos
+
+def skip_name(raw_text: str, pos: int) -> int:
+    # skip the name of the function and the blanks around it
+    pos = skip_blanks(raw_text, pos)
+    length = len(raw_text)
+    while pos < length and (raw_text[pos].isalnum() or raw_text[pos] == "_"):
+        pos += 1
+    return skip_blanks(raw_text, pos)
+
+def parse_group(raw_text: str, pos: int) -> Tuple[tuple, int]:
+    """
+    Parameters of the group opened at pos, split on its top level commas, and
+    the offset after its closing character (the end of the text if unclosed).
+    """
+    items = []
+    item = []
+    depth = 0
+    length = len(raw_text)
+    while pos < length:
+        char = raw_text[pos]
+        if char == "#":
+            pos = raw_text.find("\n", pos)
+            if pos == -1:
+                break
+            continue
+        if char in OPENING_CHARS:
+            depth += 1
+            if depth == 1:
+                pos += 1
+                continue
+        elif char in CLOSING_CHARS:
+            depth -= 1
+            if depth == 0:
+                pos += 1
+                break
+        elif char == "," and depth == 1:
+            items.append("".join(item))
+            item = []
+            pos += 1
+            continue
+        if not char.isspace():
+            item.append(char)
+        pos += 1
+    items.append("".join(item))
+    return tuple(parse_param(item) for item in items if item), pos
+
+def parse_param(item: str) -> Param:
+    # "name:type" with whitespace removed, the type may itself hold colons
+    name, colon, type = item.partition(":")
+    return Param(name, type if colon else None)
 
 def repl_imp_chars(word: str) -> str:
     to_remove = (",", "{", "}", "(", ")")
@@ -394,7 +678,7 @@ def find_colon_after_func_statement(raw_full_string: str) -> int:
             return index + 1
         index = index + 1
 
-# turn arguments or outputs into data structure List({'name': name, 'type': type})
+# turn arguments or outputs into data structure List(Param(name, type))
 def parse_args(the_slice: str) -> list:
     new_list = list()
 
@@ -404,10 +688,10 @@ def parse_args(the_slice: str) -> list:
 
         if ":" in new_arg:
             split_arg = new_arg.split(":")
-            new_list.append(dict({"name": split_arg[0], "type": split_arg[1]}))
+            new_list.append(Param(split_arg[0], split_arg[1]))
 
         else:
-            new_list.append(dict({"name": new_arg, "type": None}))
+            new_list.append(Param(new_arg, None))
 
     return new_list
 
@@ -416,4 +700,23 @@ def pairwise(iterable):
     "s -> (s0,s1), (s1,s2), (s2, s3), ..."
     a, b = tee(iterable)
     next(b, None)
-    return zip(a, b)
\ No newline at end of file
+    return zip(a, b)
+
+
+###################
+# CORE SECTION PARSERS
+###################
+register_section_parser("lang", parse_percent_header, blocks=[(HEADER, "lang")])
+register_section_parser("builtin", parse_percent_header, blocks=[(HEADER, "builtins")])
+register_section_parser("inherits", parse_inherits_prologue, blocks=[(HEADER, "inherits")])
+register_section_parser("imports", parse_imports, blocks=[(IMPORT, "")])
+register_section_parser("storage", parse_storage_var, blocks=[(DECORATED_FUNC, "storage_var")])
+register_section_parser("constructor", parse_constructor, blocks=[(DECORATED_FUNC, "constructor")])
+register_section_parser("external", parse_at_decorator, blocks=[(DECORATED_FUNC, "external")])
+register_section_parser("view", parse_at_decorator, blocks=[(DECORATED_FUNC, "view")])
+register_section_parser("const", parse_const, blocks=[(CONST, "")])
+# func filters out the storage vars, external and view functions
+register_section_parser(
+    "func", parse_func, requires=("storage", "external", "view"), blocks=[(FUNC, "")]
+)
+register_section_parser("structs", parse_structs, blocks=[(STRUCT, "")])
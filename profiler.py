@@ -0,0 +1,198 @@
+"""
+Per stage profiling of a build.
+
+Nothing is instrumented until enable_profiling is called: it then replaces the
+functions listed in INSTRUMENTED, in their module and wherever they were
+imported, by wrappers recording for each call
+
+(stage, contract, start, duration, bytes)
+
+where contract is the contract the call is attributed to: the contract it
+works on, or the one of the enclosing call. print_report summarizes the calls
+per stage and per contract and write_trace writes them as a JSON trace in the
+chrome trace event format (chrome://tracing, perfetto).
+"""
+
+import json
+import os
+import sys
+from importlib import import_module
+from pathlib import Path
+from time import perf_counter
+
+from commons import CONTRACTS_DIRECTORY
+from writer import get_artifact_path
+from parse_cairo_contract import section_parsers
+
+
+def positional(index):
+    # contract attributed to a call from one of its positional arguments
+    return lambda args: args[index] if len(args) > index else None
+
+
+def file_size(get_path):
+    # bytes processed by a call that wrote a file, its name being the second argument
+    return lambda args, result: os.path.getsize(get_path(args[1]))
+
+
+# module -> function -> (contract of a call from its args, bytes of a call from its args and result)
+INSTRUMENTED = {
+    "parse_cairo_contract": {
+        "parse_cairo_contract": (positional(0), None),
+        "parse_cairo_header": (positional(0), None),
+        "parse_contract_source": (None, lambda args, result: len(args[0])),
+        "create_dict_of_matches": (None, None),
+        "create_contract": (None, None),
+        "parse_block": (None, lambda args, result: len(result[1])),
+        "parse_percent_header": (None, None),
+        "parse_imports": (None, None),
+        "parse_storage_var": (None, None),
+        "parse_at_decorator": (None, None),
+        "parse_constructor": (None, None),
+        "parse_const": (None, None),
+        "parse_func": (None, None),
+        "parse_structs": (None, None),
+    },
+    "recursive_inheritance": {
+        "recursive_inheritance": (positional(1), None),
+        "linearize_inheritance": (None, None),
+        "merge_child_and_parent": (
+            lambda args: Path(args[1].path).stem if len(args) > 1 else None,
+            None,
+        ),
+        "merge_contracts": (None, None),
+    },
+    "writer": {
+        "read_artifact": (positional(0), None),
+        "write_artifact": (positional(1), file_size(get_artifact_path)),
+        "write_contract": (
+            positional(1),
+            file_size(lambda name: f"{CONTRACTS_DIRECTORY}/{name}.cairo"),
+        ),
+    },
+}
+
+# recorded calls (stage, contract, start, duration, bytes)
+events = list()
+# contracts of the calls in progress
+contract_stack = list()
+# (module, attribute) -> original function, for disable_profiling
+originals = dict()
+# section -> original SectionParser of the parser registry, for disable_profiling
+original_section_parsers = dict()
+
+
+def instrument(stage: str, function, get_contract, get_bytes):
+    def wrapper(*args, **kwargs):
+        contract = get_contract(args) if get_contract else None
+        if contract:
+            contract_stack.append(contract)
+        start = perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            duration = perf_counter() - start
+            if contract:
+                contract_stack.pop()
+        size = get_bytes(args, result) if get_bytes else 0
+        if not contract and contract_stack:
+            contract = contract_stack[-1]
+        events.append((stage, contract, start, duration, size))
+        return result
+
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    wrapper.__wrapped__ = function
+    return wrapper
+
+
+def enable_profiling():
+    if originals:
+        return
+    for module_name, functions in INSTRUMENTED.items():
+        module = import_module(module_name)
+        for function_name, (get_contract, get_bytes) in functions.items():
+            function = getattr(module, function_name)
+            wrapper = instrument(function_name, function, get_contract, get_bytes)
+            # rebind the function everywhere it was imported
+            for loaded in list(sys.modules.values()):
+                namespace = getattr(loaded, "__dict__", {})
+                for attribute, value in list(namespace.items()):
+                    if value is function:
+                        originals[(loaded, attribute)] = function
+                        setattr(loaded, attribute, wrapper)
+            # and in the registry of section parsers
+            for section, parser in section_parsers.items():
+                if parser.parse_function is function:
+                    original_section_parsers.setdefault(section, parser)
+                    section_parsers[section] = parser._replace(parse_function=wrapper)
+
+
+def disable_profiling():
+    for (module, attribute), function in originals.items():
+        setattr(module, attribute, function)
+    originals.clear()
+    section_parsers.update(original_section_parsers)
+    original_section_parsers.clear()
+
+
+def summarize() -> dict:
+    """
+    Totals of the recorded calls:
+
+    {
+        stages: Dict{stage: {calls, seconds, bytes}}
+        contracts: Dict{contract: Dict{stage: {calls, seconds, bytes}}}
+    }
+    """
+    stages = dict()
+    contracts = dict()
+    for stage, contract, _, duration, size in events:
+        for totals in (
+            stages.setdefault(stage, dict()),
+            contracts.setdefault(contract or "-", dict()).setdefault(stage, dict()),
+        ):
+            totals["calls"] = totals.get("calls", 0) + 1
+            totals["seconds"] = totals.get("seconds", 0) + duration
+            totals["bytes"] = totals.get("bytes", 0) + size
+    return {"stages": stages, "contracts": contracts}
+
+
+def print_report():
+    summary = summarize()
+    header = f"{'stage':<24} {'calls':>8} {'total (ms)':>11} {'bytes':>10}"
+
+    def print_table(totals_by_stage, indent=""):
+        by_time = sorted(totals_by_stage.items(), key=lambda x: -x[1]["seconds"])
+        for stage, totals in by_time:
+            print(
+                f"{indent}{stage:<24} {totals['calls']:>8} "
+                f"{totals['seconds'] * 1000:>11.2f} {totals['bytes']:>10}"
+            )
+
+    print(header)
+    print_table(summary["stages"])
+    for contract, totals_by_stage in sorted(summary["contracts"].items()):
+        print(f"\n{contract}")
+        print_table(totals_by_stage, "  ")
+
+
+def write_trace(path: str):
+    """
+    Write the recorded calls in the chrome trace event format.
+    """
+    trace_events = [
+        {
+            "name": stage,
+            "cat": contract or "-",
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": duration * 1e6,
+            "pid": os.getpid(),
+            "tid": 0,
+            "args": {"contract": contract, "bytes": size},
+        }
+        for stage, contract, start, duration, size in events
+    ]
+    with open(path, "w") as file:
+        json.dump({"traceEvents": trace_events}, file)
@@ -26,93 +26,270 @@ def combine_parsed_child_and_parent(parsed_data_of_child, parsed_data_of_parent)
     return data_structure
 """
 
-from parse_cairo_contract import parse_cairo_contract
+from parse_cairo_contract import parse_cairo_contract, parse_cairo_header
+from model import Contract, Import
 
-def recursive_inheritance(child_data_structure: dict, contract_name: str):
-    # parse the parent contract into dict
-    parent_contract_dict = parse_cairo_contract(contract_name)
+def recursive_inheritance(
+    child_data_structure: Contract,
+    contract_name: str,
+    use_cache: bool = True,
+    parsed_contracts: dict = None,
+    headers: dict = None,
+    merged_bases: dict = None,
+) -> Contract:
+    # parsed_contracts may be shared between several targets, the merge never
+    # modifies the contracts it is given so they are merged without copies
+    if parsed_contracts is None:
+        parsed_contracts = dict()
 
-    # merge parent with child
-    cairo_contract_dict = merge_child_and_parent(
-        child_data_structure, parent_contract_dict
-    )
+    # plan the merge from the headers only, then parse every contract of the graph once
+    get_inherits = get_header_inherits(headers, parsed_contracts)
+    linearization = linearize_inheritance(contract_name, get_inherits)
+    for name in linearization:
+        if name not in parsed_contracts:
+            parsed_contracts[name] = parse_cairo_contract(name, use_cache)
 
-    # if parent inherits then do depth first recursion for the chain of inheritance
-    if parent_contract_dict["inherits"]:
-        for parent in parent_contract_dict["inherits"]:
-            cairo_contract_dict = recursive_inheritance(cairo_contract_dict, parent)
+    # the linearization ends with the linearization of the last parent, which is
+    # merged once into a base shared by the targets built with the same merged_bases
+    base = None
+    inherits = get_inherits(contract_name)
+    if merged_bases is not None and inherits:
+        base_linearization = linearize_inheritance(inherits[-1], get_inherits)
+        base = get_merged_base(base_linearization, parsed_contracts, merged_bases)
+        linearization = linearization[: len(linearization) - len(base_linearization)]
 
-    return cairo_contract_dict
+    # merge from the most derived contract to the most basic one, children override parents
+    contracts = [child_data_structure] + [parsed_contracts[name] for name in linearization]
+    if base is None:
+        return merge_contracts(contracts)
 
+    merged = merge_contracts(contracts + [base])
+    # the lang and import lines of a merge depend on every contract merged, not only on the base
+    base_contracts = [parsed_contracts[name] for name in base_linearization]
+    contracts = [contract for contract in contracts + base_contracts if contract]
+    return merged.replace(lang=merge_lang(contracts), imports=merge_imports(contracts))
+
+
+def get_merged_base(linearization: list, parsed_contracts: dict, merged_bases: dict) -> Contract:
+    """
+    Merge of the contracts of a linearization, kept in merged_bases under its
+    first contract and the cache keys (hashes of the sources) of all of them.
+    Merging it into a contract gives the same result as merging its contracts
+    one by one, but for the lang and import lines, see merge_lang and merge_imports.
+    """
+    cache_keys = tuple(parsed_contracts[name].cache_key for name in linearization)
+    key = (linearization[0], cache_keys)
+    base = merged_bases.get(key)
+    if base is not None:
+        return base
+
+    base = merge_contracts([parsed_contracts[name] for name in linearization])
+    # contracts parsed outside of parse_cairo_contract have no cache key
+    if None not in cache_keys:
+        merged_bases[key] = base
+    return base
+
+
+def get_header_inherits(headers: dict = None, parsed_contracts: dict = None):
+    """
+    Function giving the contracts inherited by a contract, from the contract
+    if already parsed or else from its header. Headers are read once and
+    kept in headers.
+    """
+    headers = dict() if headers is None else headers
+    parsed_contracts = parsed_contracts or dict()
+
+    def get_inherits(name: str) -> list:
+        if name in parsed_contracts:
+            return parsed_contracts[name].inherits
+        if name not in headers:
+            headers[name] = parse_cairo_header(name)
+        return headers[name]["inherits"]
+
+    return get_inherits
 
-def merge_child_and_parent(
-    child_data_structure: dict, parent_data_structure: dict
-) -> dict:
 
+def linearize_inheritance(contract_name: str, get_inherits) -> list:
+    """
+    Order the inheritance graph of a contract so that every contract comes
+    before all of its parents and each contract appears exactly once.
+
+    The order is the reversed post order of a depth first walk visiting the
+    parents from right to left, so for A(B, C), B(D), C(D) it is A, B, C, D.
+    get_inherits gives the contracts inherited by a contract.
+
+    The walk uses an explicit stack, so its depth is not bound by the
+    recursion limit. A cycle raises a ValueError giving its path.
+    """
+    post_order = list()
+    visited = {contract_name}
+    # contracts of the current path of the walk, and the parents left to visit for each
+    path = [contract_name]
+    on_path = {contract_name}
+    parents_left = [reversed(get_inherits(contract_name))]
+
+    while parents_left:
+        parent = next(parents_left[-1], None)
+        if parent is None:
+            parents_left.pop()
+            name = path.pop()
+            on_path.remove(name)
+            post_order.append(name)
+        elif parent in on_path:
+            cycle = path[path.index(parent):] + [parent]
+            raise ValueError(f"Cyclic inheritance: {' -> '.join(cycle)}")
+        elif parent not in visited:
+            visited.add(parent)
+            path.append(parent)
+            on_path.add(parent)
+            parents_left.append(reversed(get_inherits(parent)))
+
+    return post_order[::-1]
+
+
+# sections of the contract merged by name, the child entry overrides the parent one
+MERGED_SECTIONS = ("storage", "func", "const", "structs", "view")
+
+
+def merge_child_and_parent(
+    child_data_structure: Contract, parent_data_structure: Contract
+) -> Contract:
+    """
+    New contract merging a parent into its child, see merge_contracts.
+    """
     if not child_data_structure:
         return parent_data_structure
+    return merge_contracts([child_data_structure, parent_data_structure])
 
-    merged_data_structure = child_data_structure
-
-    # check if lang is equal
-    if not merged_data_structure["lang"] == parent_data_structure["lang"]:
-        merged_data_structure["lang"].extend(parent_data_structure["lang"])
-
-    # check if all builtins from parent are in merge
-    for builtin in parent_data_structure["builtin"]:
-        if builtin and not builtin in merged_data_structure["builtin"]:
-            merged_data_structure["builtin"].append(builtin)
-
-    # inherits already handled by recursion
-    # check if any imports must be added
-    list_of_merged_package_names = [
-        list(x.keys())[0] for x in merged_data_structure["imports"]
-    ]
-    for import_ele in parent_data_structure["imports"]:
-        # there will only ever be one key in this dict by definition
-        package_name = list(import_ele.keys())[0]
-        list_of_imports = import_ele[package_name]
-
-        if not package_name in list_of_merged_package_names:
-            merged_data_structure["imports"].append(import_ele)
-        else:
-            for imports in merged_data_structure["imports"]:
-                if imports.get(package_name):
-                    for i in list_of_imports:
-                        if not i in imports[package_name]:
-                            imports[package_name].append(i)
-
-    # check if storage_vars need to be inherited
-    # CHILD IMPLEMENTATION WILL OVERRIDE PARENT
-    # NOTE: HERE WE COULD ALLOW SUPER KEYWORD TO MERGE
-    for storage_var in parent_data_structure["storage"]:
-        name = storage_var["name"]
-        if not name in [x.get("name") for x in merged_data_structure["storage"]]:
-            merged_data_structure["storage"].append(storage_var)
-
-    for func in parent_data_structure["func"]:
-        name = func["name"]
-        if not name in [x.get("name") for x in merged_data_structure["func"]]:
-            merged_data_structure["func"].append(func)
-
-    for const in parent_data_structure["const"]:
-        name = const["name"]
-        if not name in [x.get("name") for x in merged_data_structure["const"]]:
-            merged_data_structure["const"].append(const)
-
-    for struct in parent_data_structure["structs"]:
-        name = struct["name"]
-        if not name in [x.get("name") for x in merged_data_structure["structs"]]:
-            merged_data_structure["structs"].append(struct)
-
-    for view in parent_data_structure["view"]:
-        name = view["name"]
-        if not name in [x.get("name") for x in merged_data_structure["view"]]:
-            merged_data_structure["view"].append(view)
-
-    return merged_data_structure
+
+def merge_contracts(contracts: list) -> Contract:
+    """
+    Merge of contracts ordered from the most derived to the most basic one,
+    the same as merging each contract into the merge of the previous ones.
+    None contracts are skipped.
+
+    The contracts are never modified. The merged contract is a new contract
+    sharing every entry of its inputs, and every section of the first
+    contract the others add nothing to.
+    """
+    contracts = [contract for contract in contracts if contract]
+    if len(contracts) < 2:
+        return contracts[0] if contracts else None
+
+    merged = contracts[0]
+    symbol_index = get_symbol_index(merged)
+    # entries added to the sections of the first contract, by section
+    added = {section: [] for section in ("builtin",) + MERGED_SECTIONS}
+    for parent_data_structure in contracts[1:]:
+        # check if all builtins from parent are in merge
+        for builtin in parent_data_structure.builtin:
+            if builtin and not builtin in symbol_index["builtin"]:
+                added["builtin"].append(builtin)
+                symbol_index["builtin"].add(builtin)
+
+        # inherits already handled by recursion, lang and imports by merge_lang and merge_imports
+
+        # check if storage_vars, funcs, consts, structs and views need to be inherited
+        # CHILD IMPLEMENTATION WILL OVERRIDE PARENT
+        # NOTE: HERE WE COULD ALLOW SUPER KEYWORD TO MERGE
+        for section in MERGED_SECTIONS:
+            section_index = symbol_index[section]
+            merged_section = added[section]
+            for entry in getattr(parent_data_structure, section):
+                if not entry.name in section_index:
+                    merged_section.append(entry)
+                    section_index[entry.name] = entry
+
+    lang = merge_lang(contracts)
+    imports = merge_imports(contracts)
+    sections = {
+        section: getattr(merged, section) + tuple(entries) if entries else getattr(merged, section)
+        for section, entries in added.items()
+    }
+    return merged.replace(lang=lang, imports=imports, **sections)
+
+
+def get_symbol_index(merged_data_structure: Contract) -> dict:
+    """
+    Name indexes of the contract a merge starts from, kept up to date by the
+    merge:
+
+    {
+        storage, func, const, structs, view: Dict{name: entry}
+        builtin: Set[str]
+    }
+    """
+    symbol_index = {
+        section: dict() for section in MERGED_SECTIONS
+    }
+    for section in MERGED_SECTIONS:
+        for entry in getattr(merged_data_structure, section):
+            # first entry wins like the merge itself
+            symbol_index[section].setdefault(entry.name, entry)
+    symbol_index["builtin"] = set(merged_data_structure.builtin)
+
+    return symbol_index
+
+
+def merge_lang(contracts: list) -> tuple:
+    """
+    Lang of the merge of contracts, see merge_contracts: the lang of each
+    contract differing from the lang merged so far is appended to it.
+    """
+    lang = contracts[0].lang
+    for parent_data_structure in contracts[1:]:
+        # check if lang is equal
+        if not lang == parent_data_structure.lang:
+            lang = lang + parent_data_structure.lang
+    return lang
+
+
+def merge_imports(contracts: list) -> tuple:
+    """
+    Import lines of the merge of contracts, see merge_contracts. The lines of
+    a contract whose module the merge of the previous contracts does not
+    import are added as they are, even when the contract imports the module
+    on several lines. The names of the lines of an imported module are added
+    to every non empty line of that module.
+    """
+    lines = list(contracts[0].imports)
+    # module -> positions of its lines and the set of their imported names
+    modules = dict()
+    for position, line in enumerate(lines):
+        modules.setdefault(line.module, []).append((position, set(line.names)))
+    # names of the lines extended, by position, copied the first time they are extended
+    extended_names = dict()
+
+    for parent_data_structure in contracts[1:]:
+        # modules added by this contract are only extended by the next ones
+        added_modules = dict()
+        for import_ele in parent_data_structure.imports:
+            package_name = import_ele.module
+            if package_name not in modules:
+                added_modules.setdefault(package_name, []).append(
+                    (len(lines), set(import_ele.names))
+                )
+                lines.append(import_ele)
+                continue
+            for position, imported_names in modules[package_name]:
+                if not imported_names:
+                    continue
+                for i in import_ele.names:
+                    if not i in imported_names:
+                        if position not in extended_names:
+                            extended_names[position] = list(lines[position].names)
+                        extended_names[position].append(i)
+                        imported_names.add(i)
+        modules.update(added_modules)
+
+    if not extended_names and len(lines) == len(contracts[0].imports):
+        return contracts[0].imports
+    return tuple(
+        Import(line.module, extended_names[position]) if position in extended_names else line
+        for position, line in enumerate(lines)
+    )
 
 
 if __name__ == "__main__":
-    child = dict()
+    child = None
     x = recursive_inheritance(child, "A.cairo")
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Search path of the contracts.
+
+Contract names (targets and %inherits names) are resolved against a list of
+directories in priority order: CONTRACTS_DIRECTORY first, then the vendor and
+library directories added with set_search_path. Each directory is searched
+recursively.
+
+The directories are walked once into an index, contract name -> path, and
+every lookup is a dict access. The index is built on the first lookup and
+rebuilt by build_index, once per build. A name found in a directory shadows
+the same name in the following ones, a name found twice in the same
+directory is ambiguous and its resolution raises a ValueError.
+"""
+
+import os
+
+from commons import CONTRACTS_DIRECTORY
+
+# suffix of the flattened contracts, they are outputs and never resolved
+FINAL_SUFFIX = "_final"
+
+# directories searched for contracts, in priority order
+search_directories = [CONTRACTS_DIRECTORY]
+# contract name -> path, None until built
+contract_index = None
+# contract name -> paths of the highest priority directory holding it more than once
+ambiguous_contracts = dict()
+
+
+def set_search_path(directories: list) -> None:
+    """
+    Search the given directories, CONTRACTS_DIRECTORY is always searched first.
+    """
+    global contract_index
+    search_directories[:] = [CONTRACTS_DIRECTORY] + [
+        directory for directory in directories if directory != CONTRACTS_DIRECTORY
+    ]
+    contract_index = None
+
+
+def get_search_path() -> list:
+    return list(search_directories)
+
+
+def build_index() -> dict:
+    """
+    Walk the search path into the index of the contracts.
+    """
+    global contract_index
+    index = dict()
+    ambiguous_contracts.clear()
+    for directory in search_directories:
+        found = dict()
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for file in sorted(files):
+                name, extension = os.path.splitext(file)
+                if extension != ".cairo" or name.endswith(FINAL_SUFFIX) or name in index:
+                    continue
+                path = os.path.join(root, file)
+                if name in found:
+                    ambiguous_contracts.setdefault(name, [found[name]]).append(path)
+                else:
+                    found[name] = path
+        index.update(found)
+    contract_index = index
+    return contract_index
+
+
+def get_index() -> dict:
+    return build_index() if contract_index is None else contract_index
+
+
+def get_project_contracts() -> list:
+    """
+    Names of the contracts of CONTRACTS_DIRECTORY, the ones that can be built,
+    in sorted order.
+    """
+    project = os.path.join(CONTRACTS_DIRECTORY, "")
+    return sorted(name for name, path in get_index().items() if path.startswith(project))
+
+
+def resolve_contract(contract_name: str) -> str:
+    """
+    Path of a contract from its name.
+    """
+    path = get_index().get(contract_name)
+    if contract_name in ambiguous_contracts:
+        paths = ", ".join(ambiguous_contracts[contract_name])
+        raise ValueError(f"Ambiguous contract name {contract_name}, found at {paths}")
+    if path is None:
+        directories = ", ".join(search_directories)
+        raise FileNotFoundError(f"Contract {contract_name} not found in {directories}")
+    return path
@@ -0,0 +1,71 @@
+"""
+Retained source buffers of the parsed contracts.
+
+Parsed entries do not copy their text, they hold a span
+
+    [file_id, start, end]
+
+into the single buffer kept here for each file, file_id being the path of the
+contract the entry originates from. The text of an entry is only materialized
+when the final contract is written.
+
+The blocks of the last lex of each file are kept with it, so that the next
+version of the file is lexed incrementally, see lexer.relex_contract, and so
+are the words and signatures parsed from those blocks, so that the blocks
+left unchanged are not parsed again, see parse_cairo_contract.BlockCache.
+"""
+
+# file id -> source text
+source_files = dict()
+# file id -> (source text, its lexer blocks)
+lexed_files = dict()
+# file id -> parse results of the blocks of its last parse, by (kind, block text)
+parsed_blocks = dict()
+
+
+def register_source(file_id: str, contract_as_string: str) -> None:
+    source_files[file_id] = contract_as_string
+
+
+def get_source(file_id: str) -> str:
+    return source_files[file_id]
+
+
+def materialize(span: list) -> str:
+    """
+    Text of a span.
+    """
+    file_id, start, end = span
+    return source_files[file_id][start:end]
+
+
+def file_of_origin(span: list) -> str:
+    return span[0]
+
+
+def register_blocks(file_id: str, contract_as_string: str, blocks: list) -> None:
+    lexed_files[file_id] = (contract_as_string, blocks)
+
+
+def get_blocks(file_id: str):
+    """
+    Source and blocks of the last lex of a file, None if never lexed.
+    """
+    return lexed_files.get(file_id)
+
+
+def register_parsed_blocks(file_id: str, parsed: dict) -> None:
+    parsed_blocks[file_id] = parsed
+
+
+def get_parsed_blocks(file_id: str) -> dict:
+    """
+    Parse results of the blocks of the last parse of a file, empty if never parsed.
+    """
+    return parsed_blocks.get(file_id, {})
+
+
+def forget_source(file_id: str) -> None:
+    source_files.pop(file_id, None)
+    lexed_files.pop(file_id, None)
+    parsed_blocks.pop(file_id, None)
@@ -0,0 +1,304 @@
+"""
+Symbol index of every contract of the search path, in a SQLite database.
+
+contracts(name, path, project, mtime, size, hash) <- hash is the cache key of the source
+symbols(contract, kind, name, signature, start, end) <- start, end: span in the file of contract
+inherits(child, parent, position) <- %inherits edges, in header order
+
+kind is one of SYMBOL_KINDS. update_symbols brings the database up to date:
+contracts whose modification time and size are unchanged are skipped, the
+others are hashed and only parsed again if their content changed. Removed
+and ambiguous contracts are dropped. Queries only read the database:
+
+python symbols.py defines X      <- contracts defining or overriding X
+python symbols.py origin Y       <- contracts where Y is first defined in their inheritance graph
+python symbols.py affected C     <- leaf contracts inheriting from C, built again when C changes
+python symbols.py update
+"""
+
+import os
+import sqlite3
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+from commons import SYMBOL_DATABASE_PATH
+from parse_cairo_contract import get_cache_key, parse_contract_source
+from search_path import ambiguous_contracts, build_index, get_project_contracts, set_search_path
+from sources import forget_source
+
+# kind of the symbols -> section of the contract holding them
+SYMBOL_KINDS = {
+    "storage": "storage",
+    "constructor": "constructor",
+    "external": "external",
+    "view": "view",
+    "func": "func",
+    "const": "const",
+    "struct": "structs",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    project INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    contract TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_by_name ON symbols (name);
+CREATE INDEX IF NOT EXISTS symbols_by_contract ON symbols (contract);
+CREATE TABLE IF NOT EXISTS inherits (
+    child TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS inherits_by_child ON inherits (child);
+CREATE INDEX IF NOT EXISTS inherits_by_parent ON inherits (parent);
+"""
+
+# definitions of a name, each with whether it overrides a definition of the same kind
+# inherited from another contract: the contract inherits, transitively, from a
+# contract defining the name
+DEFINITIONS_QUERY = """
+WITH RECURSIVE definitions AS (
+    SELECT * FROM symbols WHERE name = :name AND (:kind IS NULL OR kind = :kind)
+),
+inheriting(kind, name) AS (
+    SELECT definitions.kind, inherits.child FROM definitions
+    JOIN inherits ON inherits.parent = definitions.contract
+    UNION
+    SELECT inheriting.kind, inherits.child FROM inheriting
+    JOIN inherits ON inherits.parent = inheriting.name
+)
+SELECT definitions.contract, definitions.kind, definitions.signature, contracts.path,
+    definitions.start, definitions.end,
+    (definitions.kind, definitions.contract) IN (SELECT kind, name FROM inheriting) AS overrides
+FROM definitions JOIN contracts ON contracts.name = definitions.contract
+ORDER BY definitions.contract, definitions.kind
+"""
+
+# leaf contracts of the project, no contract of the project inherits from them,
+# inheriting from a contract or being that contract
+AFFECTED_QUERY = """
+WITH RECURSIVE descendants(name) AS (
+    SELECT :name
+    UNION
+    SELECT inherits.child FROM inherits JOIN descendants ON inherits.parent = descendants.name
+)
+SELECT contracts.name FROM contracts JOIN descendants ON contracts.name = descendants.name
+WHERE contracts.project AND NOT EXISTS (
+    SELECT 1 FROM inherits JOIN contracts AS child ON child.name = inherits.child
+    WHERE inherits.parent = contracts.name AND child.project
+)
+ORDER BY contracts.name
+"""
+
+
+def connect(database_path: str = SYMBOL_DATABASE_PATH) -> sqlite3.Connection:
+    Path(database_path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(database_path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def update_symbols(connection: sqlite3.Connection) -> tuple:
+    """
+    Index the contracts of the search path added or changed since the last
+    update and drop the removed ones. Returns the names of the contracts
+    parsed again, the names of the contracts removed and the contracts that
+    could not be parsed, name -> error. Those are dropped from the index and
+    parsed again on the next update.
+    """
+    index = build_index()
+    project = set(get_project_contracts())
+    known = {
+        row[0]: row[1:]
+        for row in connection.execute(
+            "SELECT name, path, mtime, size, hash, project FROM contracts"
+        )
+    }
+    parsed = list()
+    failed = dict()
+    with connection:
+        for name, path in index.items():
+            row = known.pop(name, None)
+            if name in ambiguous_contracts:
+                # unresolvable, like for a build
+                if row:
+                    delete_contract(connection, name)
+                continue
+            stat = os.stat(path)
+            if row and row[:3] == (path, stat.st_mtime_ns, stat.st_size):
+                if row[4] != (name in project):
+                    connection.execute(
+                        "UPDATE contracts SET project = ? WHERE name = ?", (name in project, name)
+                    )
+                continue
+
+            with open(path) as contract:
+                contract_as_string = contract.read()
+            cache_key = get_cache_key(contract_as_string)
+            if row and row[0] == path and row[3] == cache_key:
+                # touched but unchanged
+                connection.execute(
+                    "UPDATE contracts SET project = ?, mtime = ?, size = ? WHERE name = ?",
+                    (name in project, stat.st_mtime_ns, stat.st_size, name),
+                )
+                continue
+
+            try:
+                contract = parse_contract_source(contract_as_string, path)
+            except Exception as error:
+                # a contract being edited may be invalid, the others are still indexed
+                failed[name] = str(error) if isinstance(error, ValueError) else repr(error)
+                if row:
+                    delete_contract(connection, name)
+                continue
+            finally:
+                # the text of the symbols is not needed, only their spans
+                forget_source(path)
+            delete_contract(connection, name)
+            connection.execute(
+                "INSERT INTO contracts VALUES (?, ?, ?, ?, ?, ?)",
+                (name, path, name in project, stat.st_mtime_ns, stat.st_size, cache_key),
+            )
+            connection.executemany(
+                "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?)",
+                get_symbols(name, contract),
+            )
+            connection.executemany(
+                "INSERT INTO inherits VALUES (?, ?, ?)",
+                [(name, parent, position) for position, parent in enumerate(contract.inherits)],
+            )
+            parsed.append(name)
+
+        removed = sorted(known)
+        for name in removed:
+            delete_contract(connection, name)
+    return parsed, removed, failed
+
+
+def delete_contract(connection: sqlite3.Connection, name: str) -> None:
+    connection.execute("DELETE FROM contracts WHERE name = ?", (name,))
+    connection.execute("DELETE FROM symbols WHERE contract = ?", (name,))
+    connection.execute("DELETE FROM inherits WHERE child = ?", (name,))
+
+
+def get_symbols(contract_name: str, contract) -> list:
+    """
+    Rows of the symbols table of a parsed contract.
+    """
+    rows = list()
+    for kind, section in SYMBOL_KINDS.items():
+        entries = getattr(contract, section)
+        if kind == "constructor":
+            entries = (entries,) if entries else ()
+        for entry in entries:
+            _, start, end = entry.span
+            rows.append((contract_name, kind, entry.name, get_signature(entry), start, end))
+    return rows
+
+
+def get_signature(entry) -> str:
+    """
+    name{implicits}(args) -> (outputs) of a function or storage var,
+    name(members) of a struct and name of a const.
+    """
+    if hasattr(entry, "members"):
+        return f"{entry.name}({format_params(entry.members)})"
+    if not hasattr(entry, "args"):
+        return entry.name
+    implicits = f"{{{format_params(entry.implicits)}}}" if entry.implicits else ""
+    outputs = f" -> ({format_params(entry.outputs)})" if entry.outputs else ""
+    return f"{entry.name}{implicits}({format_params(entry.args)}){outputs}"
+
+
+def format_params(params) -> str:
+    return ", ".join(f"{param.name}: {param.type}" if param.type else param.name for param in params)
+
+
+###################
+# QUERIES
+###################
+def find_definitions(connection: sqlite3.Connection, name: str, kind: str = None) -> list:
+    """
+    Definitions of a name:
+    (contract, kind, signature, path, start, end, overrides an inherited definition)
+    """
+    return [
+        row[:6] + (bool(row[6]),)
+        for row in connection.execute(DEFINITIONS_QUERY, {"name": name, "kind": kind})
+    ]
+
+
+def find_origins(connection: sqlite3.Connection, name: str, kind: str = None) -> list:
+    """
+    Definitions of a name overriding no inherited definition, see find_definitions.
+    """
+    return [row for row in find_definitions(connection, name, kind) if not row[6]]
+
+
+def find_affected_leaves(connection: sqlite3.Connection, contract_name: str) -> list:
+    return [name for name, in connection.execute(AFFECTED_QUERY, {"name": contract_name})]
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Index the symbols of the contracts and query them")
+    parser.add_argument("command", choices=("update", "defines", "origin", "affected"))
+    parser.add_argument("name", nargs="?", help="symbol, or contract for affected")
+    parser.add_argument("--kind", choices=sorted(SYMBOL_KINDS), help="only symbols of this kind")
+    parser.add_argument(
+        "--search-path",
+        action="append",
+        default=[],
+        metavar="DIRECTORY",
+        help="directory indexed after the contracts directory, may be given several times",
+    )
+    parser.add_argument(
+        "--no-update",
+        action="store_true",
+        help="query the database as it is, without indexing the changed contracts first",
+    )
+    args = parser.parse_args()
+    if args.command != "update" and not args.name:
+        parser.error(f"{args.command} needs a name")
+    set_search_path(args.search_path)
+
+    connection = connect()
+    try:
+        if args.command == "update" or not args.no_update:
+            parsed, removed, failed = update_symbols(connection)
+            for name, error in failed.items():
+                print(f"could not index {name}: {error}", file=sys.stderr)
+            if args.command == "update":
+                print(f"{len(parsed)} contracts indexed, {len(removed)} removed")
+                return 1 if failed else 0
+
+        if args.command == "affected":
+            for name in find_affected_leaves(connection, args.name):
+                print(name)
+            return 0
+
+        find = find_definitions if args.command == "defines" else find_origins
+        for contract, kind, signature, path, start, end, overrides in find(
+            connection, args.name, args.kind
+        ):
+            note = " (overrides)" if overrides else ""
+            print(f"{contract} {kind} {signature} {path}:{start}-{end}{note}")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+# the modules of the repository are imported from its root, like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_path import set_search_path
+
+
+@pytest.fixture
+def write_contracts(tmp_path, monkeypatch):
+    """
+    Function writing contracts, name -> source, into the contracts directory
+    of a temporary project the test runs in.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "contracts").mkdir()
+
+    def write(contracts: dict):
+        for name, source in contracts.items():
+            (tmp_path / "contracts" / f"{name}.cairo").write_text(source)
+        # the index of the search path is built again on the next lookup
+        set_search_path([])
+
+    yield write
+    set_search_path([])
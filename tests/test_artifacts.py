@@ -0,0 +1,107 @@
+import pytest
+
+import writer
+from model import Contract
+from parse_cairo_contract import parse_contract_source
+from writer import (
+    ARTIFACT_EXTENSIONS,
+    BINARY_FORMAT,
+    BINARY_MAGIC,
+    get_artifact_path,
+    read_artifact,
+    render_contract,
+    set_artifact_format,
+    write_artifact,
+)
+
+CONTRACT = """%lang starknet
+%builtins pedersen range_check
+
+from starkware.cairo.common.uint256 import (Uint256, uint256_add)
+
+struct Point:
+    member x : felt
+    member y : felt
+end
+
+const SCALE = 10
+
+@storage_var
+func points(key: felt) -> (point: Point):
+end
+
+@constructor
+func constructor{syscall_ptr : felt*}(owner: felt):
+    return ()
+end
+
+@external
+func set_point{syscall_ptr : felt*, range_check_ptr}(key: felt, point: Point):
+    points.write(key, point)
+    return ()
+end
+
+@view
+func get_point(key: felt) -> (point: Point):
+    let (point) = points.read(key)
+    return (point)
+end
+
+func scale(a: felt) -> (b: felt):
+    return (a * SCALE)
+end
+"""
+
+
+@pytest.fixture
+def contract() -> Contract:
+    contract = parse_contract_source(CONTRACT, "<test>/artifact.cairo")
+    contract.cache_key = "key"
+    return contract.replace(extensions={"notes": ["a", "b"]})
+
+
+@pytest.fixture
+def artifact_format(request, write_contracts):
+    write_contracts({})
+    default_format = writer.get_artifact_format()
+    set_artifact_format(request.param)
+    yield request.param
+    set_artifact_format(default_format)
+
+
+def test_tuple_round_trip(contract):
+    read = Contract.from_tuple(contract.to_tuple())
+    assert read.to_tuple() == contract.to_tuple()
+    assert render_contract(read) == render_contract(contract)
+
+
+@pytest.mark.parametrize("artifact_format", sorted(ARTIFACT_EXTENSIONS), indirect=True)
+def test_artifact_round_trip(contract, artifact_format):
+    assert write_artifact(contract, "Artifact")
+    # unchanged artifacts are not written again
+    assert not write_artifact(contract, "Artifact")
+    read = read_artifact("Artifact")
+    assert read.to_tuple() == contract.to_tuple()
+    assert read.cache_key == "key"
+    assert render_contract(read) == render_contract(contract)
+
+
+@pytest.mark.parametrize("artifact_format", [BINARY_FORMAT], indirect=True)
+def test_unreadable_binary_artifact(contract, artifact_format):
+    assert read_artifact("Artifact") is None
+    write_artifact(contract, "Artifact")
+    path = get_artifact_path("Artifact")
+    with open(path, "rb") as artifact:
+        data = artifact.read()
+
+    for unreadable in (b"", data[: len(BINARY_MAGIC) + 10], b"not an artifact" + data):
+        with open(path, "wb") as artifact:
+            artifact.write(unreadable)
+        assert read_artifact("Artifact") is None
+
+
+@pytest.mark.parametrize("artifact_format", [BINARY_FORMAT], indirect=True)
+def test_binary_artifact_of_other_version(contract, artifact_format, monkeypatch):
+    write_artifact(contract, "Artifact")
+    monkeypatch.setattr(writer, "BINARY_VERSION", writer.BINARY_VERSION + 1)
+    assert read_artifact("Artifact") is None
@@ -0,0 +1,29 @@
+from collections import Counter
+
+import manifest
+from batch import build_all
+
+BASE = "%lang starknet\n\nfunc base():\n    return ()\nend\n"
+
+
+def leaf(name: str) -> str:
+    return f"%inherits Base\n%lang starknet\n\nfunc {name}_function():\n    return ()\nend\n"
+
+
+def test_sources_hashed_once_per_build(write_contracts, monkeypatch):
+    write_contracts({"Base": BASE, "L1": leaf("L1"), "L2": leaf("L2"), "L3": leaf("L3")})
+    hashed = Counter()
+    hash_file = manifest.hash_file
+
+    def count_hash(path):
+        hashed[path] += 1
+        return hash_file(path)
+
+    monkeypatch.setattr(manifest, "hash_file", count_hash)
+    assert build_all(workers=1) == ["L1_final", "L2_final", "L3_final"]
+    assert hashed["contracts/Base.cairo"] == 1
+
+    # a build with nothing to do
+    hashed.clear()
+    assert build_all(workers=1) == []
+    assert hashed["contracts/Base.cairo"] == 1
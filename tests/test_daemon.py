@@ -0,0 +1,74 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+import client
+from commons import DAEMON_SOCKET_PATH
+from daemon import BuildDaemon
+
+VALID = "%lang starknet\n\nfunc f():\n    return ()\nend\n"
+
+
+def wait_for_socket():
+    deadline = time.monotonic() + 5
+    while not os.path.exists(DAEMON_SOCKET_PATH):
+        assert time.monotonic() < deadline, "the daemon did not start"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def daemon(write_contracts):
+    write_contracts({"A": VALID, "New": "", "Broken": "%lang starknet\nfrom\n"})
+    build_daemon = BuildDaemon(use_cache=False)
+    thread = threading.Thread(target=build_daemon.run, daemon=True)
+    thread.start()
+    wait_for_socket()
+    yield build_daemon
+    client.send_request({"command": "stop"})
+    thread.join(5)
+
+
+def test_invalid_contracts_reported_as_errors(daemon):
+    response = client.send_request({"command": "build", "targets": ["A", "New", "Broken"]})
+    assert response["written"] == ["A_final"]
+    assert sorted(response["errors"]) == ["Broken", "New"]
+
+
+def test_failed_request_answered(daemon):
+    def fail(request):
+        raise RuntimeError("boom")
+
+    # restored before the daemon is stopped
+    daemon.handle_request = fail
+    try:
+        response = client.send_request({"command": "build", "targets": ["A"]})
+    finally:
+        del daemon.handle_request
+    assert "boom" in response["error"]
+
+
+def test_client_handles_missing_answer(write_contracts, monkeypatch, capsys):
+    write_contracts({})
+    os.makedirs(os.path.dirname(DAEMON_SOCKET_PATH))
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(DAEMON_SOCKET_PATH)
+    server.listen()
+
+    def close_without_answer():
+        connection, _ = server.accept()
+        connection.recv(1024)
+        connection.close()
+
+    thread = threading.Thread(target=close_without_answer, daemon=True)
+    thread.start()
+    monkeypatch.setattr(sys, "argv", ["client.py", "A"])
+    try:
+        assert client.main() == 1
+    finally:
+        thread.join(5)
+        server.close()
+    assert "invalid answer from the build daemon" in capsys.readouterr().err
@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from flatten import flatten_sources
+
+DEPTH = 10_000
+# far above the linear time of the chain, a quadratic merge takes minutes
+TIME_LIMIT = 5.0
+
+
+def chain_sources(depth: int, cyclic: bool = False) -> dict:
+    """
+    Contracts C0 -> C1 -> ... -> C<depth - 1>, the last one inheriting C0 if cyclic.
+    """
+    sources = dict()
+    for i in range(depth):
+        parent = f"C{i + 1}" if i + 1 < depth else ("C0" if cyclic else None)
+        header = f"%inherits {parent}\n" if parent else ""
+        sources[f"C{i}"] = f"{header}%lang starknet\n\nfunc f{i}():\n    return ()\nend\n"
+    return sources
+
+
+def test_deep_chain_flattens_quickly():
+    sources = chain_sources(DEPTH)
+    start = time.perf_counter()
+    result = flatten_sources(sources, "C0")
+    assert time.perf_counter() - start < TIME_LIMIT
+    assert [function.name for function in result.contract.func] == [f"f{i}" for i in range(DEPTH)]
+
+
+def test_deep_cycle_reports_its_path():
+    sources = chain_sources(DEPTH, cyclic=True)
+    start = time.perf_counter()
+    with pytest.raises(ValueError) as error:
+        flatten_sources(sources, "C0")
+    assert time.perf_counter() - start < TIME_LIMIT
+    path = " -> ".join(f"C{i}" for i in range(DEPTH))
+    assert str(error.value) == f"Cyclic inheritance: {path} -> C0"
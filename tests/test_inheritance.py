@@ -0,0 +1,83 @@
+import pytest
+
+import recursive_inheritance
+from parse_cairo_contract import parse_cairo_contract, parse_cairo_header, parse_contract_source
+from recursive_inheritance import linearize_inheritance, merge_contracts
+
+DIAMOND = {"A": ["B", "C"], "B": ["D"], "C": ["D"], "D": []}
+MULTI_LEVEL = {"E": ["A"], "A": ["B", "C"], "B": ["D"], "C": ["D"], "D": []}
+
+
+def contract_source(name: str, inherits: list) -> str:
+    header = f"%inherits {' '.join(inherits)}\n" if inherits else ""
+    return f"{header}%lang starknet\n\nfunc {name}_function():\n    return ()\nend\n"
+
+
+def test_diamond_order():
+    assert linearize_inheritance("A", DIAMOND.__getitem__) == ["A", "B", "C", "D"]
+
+
+def test_multi_level_order():
+    assert linearize_inheritance("E", MULTI_LEVEL.__getitem__) == ["E", "A", "B", "C", "D"]
+
+
+@pytest.mark.parametrize("graph, target", [(DIAMOND, "A"), (MULTI_LEVEL, "E")])
+def test_each_contract_parsed_once(write_contracts, monkeypatch, graph, target):
+    write_contracts({name: contract_source(name, inherits) for name, inherits in graph.items()})
+    parsed = list()
+    parse_cairo_contract = recursive_inheritance.parse_cairo_contract
+
+    def count_parse(name, use_cache=True):
+        parsed.append(name)
+        return parse_cairo_contract(name, use_cache)
+
+    monkeypatch.setattr(recursive_inheritance, "parse_cairo_contract", count_parse)
+    merged = recursive_inheritance.recursive_inheritance(None, target, use_cache=False)
+
+    assert sorted(parsed) == sorted(graph)
+    # children come before their parents in the merged contract
+    expected = linearize_inheritance(target, graph.__getitem__)
+    assert [function.name for function in merged.func] == [f"{name}_function" for name in expected]
+
+
+def test_cycle_raises():
+    graph = {"A": ["B"], "B": ["C"], "C": ["A"]}
+    with pytest.raises(ValueError, match="Cyclic inheritance: A -> B -> C -> A"):
+        linearize_inheritance("A", graph.__getitem__)
+
+
+def test_inherits_only_in_prologue(write_contracts):
+    # the builds are planned from the headers, the parse must find the same parents
+    source = "%lang starknet\n\n# comment\n%inherits P\n\nfunc f():\n    return ()\nend\n"
+    write_contracts({"A": source, "P": contract_source("P", [])})
+    assert parse_cairo_header("A")["inherits"] == ["P"]
+    assert parse_cairo_contract("A", use_cache=False).inherits == ("P",)
+
+    write_contracts({"A": "%lang starknet\nfrom a import b\n%inherits P\n"})
+    assert parse_cairo_header("A")["inherits"] == []
+    with pytest.raises(ValueError, match="%inherits"):
+        parse_cairo_contract("A", use_cache=False)
+
+
+def test_import_lines_merged_like_the_baseline():
+    child = parse_contract_source("%lang starknet\nfrom n import x\n", "<test>/child.cairo")
+    parent = parse_contract_source(
+        "%lang starknet\nfrom m import a\nfrom m import b\nfrom n import y\n", "<test>/parent.cairo"
+    )
+    grandparent = parse_contract_source("%lang starknet\nfrom m import c\n", "<test>/grandparent.cairo")
+    merged = merge_contracts([child, parent, grandparent])
+    # the lines of a module new to the merge are kept as they are, then extended
+    assert [(line.module, line.names) for line in merged.imports] == [
+        ("n", ("x", "y")),
+        ("m", ("a", "c")),
+        ("m", ("b", "c")),
+    ]
+
+
+def test_merge_shares_no_mutable_state():
+    child = parse_contract_source("%lang starknet\nfunc f():\nend\n", "<test>/child.cairo")
+    parent = parse_contract_source("%lang starknet\nfunc g():\nend\n", "<test>/parent.cairo")
+    merged = merge_contracts([child, parent])
+    merged.extensions["added"] = True
+    assert "added" not in child.extensions
+    assert not hasattr(merged, "symbol_index")
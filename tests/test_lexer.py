@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from benchmarks.generator import generate_contract
+from lexer import lex_contract, relex_contract
+from parse_cairo_contract import parse_contract_source
+from sources import forget_source
+
+# text inserted by the random edits, including broken and unclosed blocks
+SNIPPETS = [
+    "",
+    "end",
+    "\nend\n",
+    "\n",
+    " ",
+    "#",
+    "x",
+    ")",
+    "func f():\n",
+    "@view\n",
+    "struct S:\n",
+    "from a import (b,\n",
+    "    c)\n",
+    "%lang starknet\n",
+    "const k = 1\n",
+    "if x == 1:\n",
+    "namespace N:\n",
+    "@external\nfunc g{s : felt*}(a : (felt, felt)) -> (r : felt):\n    return (1)\nend\n",
+]
+
+# an import left unclosed in it is not closed by the text after it
+WITHOUT_PARENTHESES = """%lang starknet
+from a import b
+
+const k = 1
+
+struct S:
+    member a : felt
+end
+"""
+
+
+def edit(rng: random.Random, contract: str) -> str:
+    for _ in range(rng.randint(1, 3)):
+        start = rng.randint(0, len(contract))
+        end = min(len(contract), start + rng.choice([0, 0, 1, 3, 10, 50]))
+        contract = contract[:start] + rng.choice(SNIPPETS) + contract[end:]
+    return contract
+
+
+def imported_names(contract) -> list:
+    return [name for entry in contract.imports for name in entry.names]
+
+
+def test_import_closed_by_edit():
+    file_id = "<test>/unclosed_import.cairo"
+    parse_contract_source("%lang starknet\nfrom a import (b,\n\nconst k = 1\n", file_id)
+    edited = "%lang starknet\nfrom a import (b,\n\n    c)\n\nconst k = 1\n"
+    assert imported_names(parse_contract_source(edited, file_id)) == ["b", "c"]
+    forget_source(file_id)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_relex_same_as_lex(seed):
+    rng = random.Random(seed)
+    file_id = f"<test>/relex_{seed}.cairo"
+    for trial in range(100):
+        generated = generate_contract(
+            "Relex",
+            functions=rng.choice([rng.randint(0, 6), rng.randint(10, 20)]),
+            storage_vars=rng.randint(0, 3),
+            structs=rng.randint(0, 3),
+        )
+        contract = rng.choice([WITHOUT_PARENTHESES, generated])
+        blocks = list(lex_contract(contract))
+        for _ in range(5):
+            edited = edit(rng, contract)
+            relexed = relex_contract(contract, blocks, edited)
+            blocks = list(lex_contract(edited))
+            assert relexed == blocks, (trial, contract, edited)
+            contract = edited
+
+        # the blocks and parse results of the previous trials are reused
+        try:
+            incremental = parse_contract_source(contract, file_id).to_tuple()
+        except Exception as error:
+            incremental = type(error)
+        forget_source(file_id)
+        try:
+            fresh = parse_contract_source(contract, file_id).to_tuple()
+        except Exception as error:
+            fresh = type(error)
+        assert incremental == fresh, (trial, contract)
+    forget_source(file_id)
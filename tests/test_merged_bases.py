@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from flatten import flatten_sources
+
+LANGS = ["starknet", "starknet", "starknet", "other"]
+BUILTINS = ["pedersen", "range_check", "ecdsa"]
+MODULES = ["m", "n", "p"]
+IMPORTED = ["a", "b", "c", "d"]
+# names shared between contracts, so that children override their parents
+SYMBOLS = ["s0", "s1", "s2", "s3", "s4"]
+
+
+def random_sources(rng: random.Random, size: int) -> dict:
+    """
+    Sources of a random inheritance graph, every contract inheriting from
+    contracts after it, with repeated import modules and symbol names.
+    """
+    names = [f"C{i}" for i in range(size)]
+    sources = dict()
+    for position, name in enumerate(names):
+        later = names[position + 1 :]
+        parents = rng.sample(later, min(len(later), rng.randint(0, 3)))
+        lines = [f"%inherits {' '.join(parents)}"] if parents else []
+        lines.append(f"%lang {rng.choice(LANGS)}")
+        builtins = rng.sample(BUILTINS, rng.randint(0, 2))
+        if builtins:
+            lines.append(f"%builtins {' '.join(builtins)}")
+        for _ in range(rng.randint(0, 3)):
+            imported = rng.sample(IMPORTED, rng.randint(1, 3))
+            lines.append(f"from {rng.choice(MODULES)} import {', '.join(imported)}")
+        for symbol in rng.sample(SYMBOLS, rng.randint(0, 3)):
+            lines.append(f"\n@storage_var\nfunc {symbol}_map() -> (res: felt):\nend")
+        for symbol in rng.sample(SYMBOLS, rng.randint(0, 3)):
+            lines.append(f"\nfunc {symbol}():\n    return ()\nend")
+        for symbol in rng.sample(SYMBOLS, rng.randint(0, 2)):
+            lines.append(f"const {symbol}_const = {position}")
+        sources[name] = "\n".join(lines) + "\n"
+    return sources
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_shared_merged_bases_same_as_separate_merges(seed):
+    rng = random.Random(seed)
+    sources = random_sources(rng, rng.randint(3, 12))
+    inherited = {
+        parent
+        for source in sources.values()
+        if source.startswith("%inherits")
+        for parent in source.splitlines()[0].split()[1:]
+    }
+    targets = [name for name in sources if name not in inherited]
+    expected = dict()
+    for target in targets:
+        result = flatten_sources(sources, target)
+        expected[target] = (result.source, result.contract.to_tuple())
+
+    # targets built in any order, each result mutated afterwards
+    rng.shuffle(targets)
+    parsed_contracts = dict()
+    merged_bases = dict()
+    for target in targets:
+        result = flatten_sources(
+            sources, target, parsed_contracts=parsed_contracts, merged_bases=merged_bases
+        )
+        assert (result.source, result.contract.to_tuple()) == expected[target], (seed, sources)
+        result.contract.extensions["built"] = target
@@ -0,0 +1,161 @@
+import time
+
+import pytest
+
+import parse_cairo_contract
+from parse_cairo_contract import parse_cairo_contract as parse_contract_file
+from parse_cairo_contract import parse_contract_source, parse_signature
+from sources import forget_source, get_parsed_blocks
+from writer import render_contract
+
+DECORATED_WITH_COMMENTS = """%lang starknet
+
+@storage_var
+func balance() -> (res: felt):
+end
+
+@external
+# bump, see func helper
+func increase{syscall_ptr : felt*}(amount: felt):
+    return ()
+end
+
+func helper(a: felt) -> (b: felt):
+    return (a)
+end
+"""
+
+
+def test_decorated_function_named_after_func_keyword():
+    contract = parse_contract_source(DECORATED_WITH_COMMENTS, "<test>/decorated.cairo")
+    assert [function.name for function in contract.external] == ["increase"]
+    assert [param.name for param in contract.external[0].args] == ["amount"]
+    assert [param.name for param in contract.external[0].implicits] == ["syscall_ptr"]
+    # the external is not taken for an internal function too
+    assert [function.name for function in contract.func] == ["helper"]
+    assert render_contract(contract).count("func increase") == 1
+
+
+###################
+# SIGNATURES
+###################
+
+# bound of the run time of a single adversarial signature, far above the
+# linear scan time and far below a quadratic one
+SIGNATURE_TIME_LIMIT = 1.0
+
+
+def names_and_types(params) -> list:
+    return [(param.name, param.type) for param in params]
+
+
+def parse_in_time(raw_text: str):
+    start = time.perf_counter()
+    signature = parse_signature(raw_text)
+    assert time.perf_counter() - start < SIGNATURE_TIME_LIMIT
+    return signature
+
+
+def test_tuple_and_pointer_types():
+    implicits, args, outputs = parse_signature(
+        "func f{syscall_ptr : felt*}(a: (felt, felt), b: felt*) -> (c: (felt, (felt, felt*))):"
+    )
+    assert names_and_types(implicits) == [("syscall_ptr", "felt*")]
+    assert names_and_types(args) == [("a", "(felt,felt)"), ("b", "felt*")]
+    assert names_and_types(outputs) == [("c", "(felt,(felt,felt*))")]
+
+
+def test_func_keyword_in_comment_skipped():
+    implicits, args, _ = parse_signature(
+        "@external\n# see func helper\nfunc increase{syscall_ptr : felt*}(amount: felt):"
+    )
+    assert names_and_types(implicits) == [("syscall_ptr", "felt*")]
+    assert names_and_types(args) == [("amount", "felt")]
+
+
+def test_comments_inside_groups_skipped():
+    _, args, _ = parse_signature("func f(\n    a: felt,  # first, (unbalanced\n    b: felt\n):")
+    assert names_and_types(args) == [("a", "felt"), ("b", "felt")]
+
+
+def test_deep_nesting():
+    depth = 100_000
+    _, args, _ = parse_in_time(f"func f(a: {'(' * depth}felt{')' * depth}, b: felt):")
+    assert [param.name for param in args] == ["a", "b"]
+
+
+def test_unclosed_groups():
+    _, args, _ = parse_in_time("func f(a: (felt, " + "(" * 100_000 + "felt, " * 100_000)
+    assert [param.name for param in args] == ["a"]
+    implicits, args, outputs = parse_in_time("func f{" + "p : felt*, " * 50_000)
+    assert len(implicits) == 50_000
+    assert args == outputs == ()
+
+
+def test_huge_comma_lists():
+    count = 50_000
+    _, args, outputs = parse_in_time(
+        f"func f({', '.join(f'a{i}: felt' for i in range(count))}) -> ({',' * count}):"
+    )
+    assert len(args) == count
+    assert outputs == ()
+
+
+@pytest.mark.parametrize(
+    "comment", ["# func " * 100_000, "#" * 200_000], ids=["func keywords", "hashes"]
+)
+def test_many_func_keywords_in_comments(comment):
+    _, args, _ = parse_in_time(f"{comment}\nfunc f(a: felt):")
+    assert [param.name for param in args] == ["a"]
+
+
+###################
+# INCREMENTAL PARSING
+###################
+
+FUNCTIONS = "%lang starknet\n" + "".join(
+    f"\nfunc f{i}(a{i}: felt) -> (r: felt):\n    return (a{i})\nend\n" for i in range(10)
+)
+
+
+@pytest.fixture
+def parsed_signatures(monkeypatch) -> list:
+    """
+    Texts whose signature is parsed, in parsing order.
+    """
+    parsed = list()
+
+    def record(raw_text):
+        parsed.append(raw_text)
+        return parse_signature(raw_text)
+
+    monkeypatch.setattr(parse_cairo_contract, "parse_signature", record)
+    return parsed
+
+
+def test_edit_only_parses_edited_blocks(parsed_signatures):
+    file_id = "<test>/incremental.cairo"
+    parse_contract_source(FUNCTIONS, file_id)
+    assert len(parsed_signatures) == 10
+
+    edited = FUNCTIONS.replace("func f3(a3: felt)", "func f3(a3: felt, b3: felt)")
+    del parsed_signatures[:]
+    contract = parse_contract_source(edited, file_id)
+    assert len(parsed_signatures) == 1
+    assert [param.name for param in contract.func[3].args] == ["a3", "b3"]
+
+    # only the parse results of the current blocks are kept, header included
+    assert len(get_parsed_blocks(file_id)) == 1 + 10 * 2
+    forget_source(file_id)
+    assert get_parsed_blocks(file_id) == {}
+    del parsed_signatures[:]
+    assert parse_contract_source(edited, file_id).to_tuple() == contract.to_tuple()
+    assert len(parsed_signatures) == 10
+    forget_source(file_id)
+
+
+def test_no_cache_parses_from_scratch(write_contracts, parsed_signatures):
+    write_contracts({"A": FUNCTIONS})
+    parse_contract_file("A", use_cache=False)
+    parse_contract_file("A", use_cache=False)
+    assert len(parsed_signatures) == 20
@@ -0,0 +1,58 @@
+import pytest
+
+import parse_cairo_contract
+from lexer import DECORATED_FUNC
+from manifest import hash_inputs
+from parse_cairo_contract import parse_cairo_contract as parse, register_section_parser
+
+SOURCE = """%lang starknet
+
+@event
+func increased(amount: felt):
+end
+
+func increase(amount: felt):
+    return ()
+end
+"""
+
+
+@pytest.fixture
+def registry():
+    """
+    Restore the section parsers registered by a test.
+    """
+    section_parsers = dict(parse_cairo_contract.section_parsers)
+    block_sections = dict(parse_cairo_contract.block_sections)
+    parse_order = list(parse_cairo_contract.parse_order)
+    yield
+    parse_cairo_contract.section_parsers.clear()
+    parse_cairo_contract.section_parsers.update(section_parsers)
+    parse_cairo_contract.block_sections.clear()
+    parse_cairo_contract.block_sections.update(block_sections)
+    parse_cairo_contract.parse_order[:] = parse_order
+
+
+def parse_events(current_dict, contract, matches):
+    return [
+        parse_cairo_contract.parse_name(contract[match["func_start"] : match["finish"]].split()[1])
+        for match in matches
+    ]
+
+
+def test_registered_section_invalidates_cached_artifacts(write_contracts, registry):
+    write_contracts({"A": SOURCE})
+    inputs = hash_inputs(["A"])
+    assert parse("A").extensions == {}
+
+    register_section_parser("events", parse_events, blocks=[(DECORATED_FUNC, "event")])
+    assert parse("A").extensions == {"events": ["increased"]}
+    assert hash_inputs(["A"]) != inputs
+
+    # a new version of the section parser is not served from the artifact of the previous one
+    register_section_parser(
+        "events", lambda *args: ["v2"], blocks=[(DECORATED_FUNC, "event")], version="2"
+    )
+    assert parse("A").extensions == {"events": ["v2"]}
+    # the cached artifact of the current parsers is reused
+    assert parse("A").extensions == {"events": ["v2"]}
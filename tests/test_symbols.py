@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from symbols import connect, find_affected_leaves, find_definitions, find_origins, update_symbols
+
+HELPER = "\nfunc helper(a: felt) -> (b: felt):\n    return (a)\nend\n"
+BALANCE = "\n@storage_var\nfunc balance() -> (res: felt):\nend\n"
+GET = "\n@view\nfunc get() -> (res: felt):\n    return (0)\nend\n"
+
+# A inherits B inherits C, D stands alone
+CONTRACTS = {
+    "A": "%inherits B\n%lang starknet\n" + GET,
+    "B": "%inherits C\n%lang starknet\n" + HELPER,
+    "C": "%lang starknet\n" + BALANCE + HELPER,
+    "D": "%lang starknet\n" + BALANCE,
+}
+
+
+@pytest.fixture
+def connection(write_contracts):
+    write_contracts(CONTRACTS)
+    connection = connect()
+    yield connection
+    connection.close()
+
+
+def contracts_and_overrides(definitions) -> list:
+    return [(contract, kind, overrides) for contract, kind, *_, overrides in definitions]
+
+
+def test_definitions_and_overrides(connection):
+    parsed, removed, failed = update_symbols(connection)
+    assert sorted(parsed) == ["A", "B", "C", "D"]
+    assert removed == [] and failed == {}
+
+    helper = find_definitions(connection, "helper")
+    assert contracts_and_overrides(helper) == [("B", "func", True), ("C", "func", False)]
+    assert helper[0][2] == "helper(a: felt) -> (b: felt)"
+    _, _, _, path, start, end, _ = helper[0]
+    with open(path) as contract:
+        assert contract.read()[start:end].startswith("func helper")
+
+    # D does not inherit from C, its balance overrides nothing
+    balance = find_definitions(connection, "balance", "storage")
+    assert contracts_and_overrides(balance) == [("C", "storage", False), ("D", "storage", False)]
+    assert find_definitions(connection, "balance", "func") == []
+
+
+def test_origins(connection):
+    update_symbols(connection)
+    assert [row[0] for row in find_origins(connection, "helper")] == ["C"]
+    assert [row[0] for row in find_origins(connection, "balance")] == ["C", "D"]
+    assert [row[0] for row in find_origins(connection, "get", "view")] == ["A"]
+
+
+def test_affected_leaves(connection):
+    update_symbols(connection)
+    assert find_affected_leaves(connection, "C") == ["A"]
+    assert find_affected_leaves(connection, "A") == ["A"]
+    assert find_affected_leaves(connection, "D") == ["D"]
+    assert find_affected_leaves(connection, "Unknown") == []
+
+
+def test_incremental_update_and_removal(connection, write_contracts):
+    update_symbols(connection)
+    assert update_symbols(connection) == ([], [], {})
+
+    # a touched but unchanged contract is not parsed again
+    os.utime("contracts/A.cairo", ns=(1, 1))
+    assert update_symbols(connection) == ([], [], {})
+
+    write_contracts({"B": "%lang starknet\n" + HELPER})
+    os.utime("contracts/B.cairo", ns=(2, 2))
+    os.remove("contracts/D.cairo")
+    assert update_symbols(connection) == (["B"], ["D"], {})
+    # B no longer inherits from C
+    assert contracts_and_overrides(find_definitions(connection, "helper")) == [
+        ("B", "func", False),
+        ("C", "func", False),
+    ]
+    assert find_affected_leaves(connection, "C") == ["C"]
+    assert [row[0] for row in find_definitions(connection, "balance")] == ["C"]
+
+
+def test_invalid_contract_skipped(connection, write_contracts):
+    write_contracts({"Broken": "%lang starknet\nfrom\n"})
+    parsed, _, failed = update_symbols(connection)
+    assert sorted(parsed) == ["A", "B", "C", "D"]
+    assert list(failed) == ["Broken"]
+    assert [row[0] for row in find_origins(connection, "helper")] == ["C"]
+
+    # indexed again once fixed
+    write_contracts({"Broken": "%lang starknet\n" + GET})
+    assert update_symbols(connection) == (["Broken"], [], {})
+    assert [row[0] for row in find_definitions(connection, "get")] == ["A", "Broken"]
@@ -0,0 +1,71 @@
+from parse_cairo_contract import parse_contract_source
+from tree_shaking import shake_contract
+
+CONTRACT = """%lang starknet
+
+struct Point:
+    member x : felt
+    member y : felt
+end
+
+struct Unused:
+    member a : felt
+end
+
+const SCALE = 10
+const UNUSED_CONST = 1
+
+@storage_var
+func points(key: felt) -> (point: Point):
+end
+
+@storage_var
+func unused_map() -> (res: felt):
+end
+
+func scale(a: felt) -> (b: felt):
+    return (a * SCALE)
+end
+
+func unused_helper():
+    return (UNUSED_CONST)
+end
+
+@view
+func get_x{syscall_ptr : felt*}(key: felt) -> (x: felt):
+    # unused_map is not read
+    let (point) = points.read(key)
+    let (x) = scale(point.x)
+    return (x)
+end
+"""
+
+
+def names(entries) -> list:
+    return [entry.name for entry in entries]
+
+
+def test_only_reachable_entries_kept():
+    contract = parse_contract_source(CONTRACT, "<test>/shaken.cairo")
+    shaken = shake_contract(contract)
+
+    # get_x -> points -> Point, get_x -> scale -> SCALE, comments excluded
+    assert names(shaken.view) == ["get_x"]
+    assert names(shaken.storage) == ["points"]
+    assert names(shaken.structs) == ["Point"]
+    assert names(shaken.func) == ["scale"]
+    assert names(shaken.const) == ["SCALE"]
+
+    # the flattened contract is left unchanged
+    assert names(contract.func) == ["scale", "unused_helper"]
+    assert names(contract.const) == ["SCALE", "UNUSED_CONST"]
+    assert names(contract.storage) == ["points", "unused_map"]
+    assert names(contract.structs) == ["Point", "Unused"]
+
+
+def test_entries_reachable_from_the_constructor_kept():
+    source = CONTRACT + "\n@constructor\nfunc constructor():\n    unused_helper()\n    return ()\nend\n"
+    shaken = shake_contract(parse_contract_source(source, "<test>/constructor.cairo"))
+    assert names(shaken.func) == ["scale", "unused_helper"]
+    assert names(shaken.const) == ["SCALE", "UNUSED_CONST"]
+    assert names(shaken.storage) == ["points"]
@@ -0,0 +1,41 @@
+import os
+
+from search_path import set_search_path
+from watch import ContractWatcher
+
+VALID = "%lang starknet\n\nfunc f():\n    return ()\nend\n"
+
+
+def test_invalid_contract_does_not_stop_the_watcher(write_contracts, capsys):
+    write_contracts({"A": VALID})
+    watcher = ContractWatcher(use_cache=False, workers=1)
+    assert watcher.build_all() == ["A_final"]
+
+    # an editor creating a new file, and a contract in the middle of an edit
+    write_contracts({"New": "", "Broken": "%lang starknet\nfrom\n"})
+    assert watcher.poll() == []
+    output = capsys.readouterr().out
+    assert "could not flatten New" in output
+    assert "could not flatten Broken" in output
+
+    # the other contracts are still built
+    write_contracts({"A": VALID + "\nconst k = 1\n"})
+    os.utime("contracts/A.cairo", ns=(1, 1))
+    assert watcher.poll() == ["A_final"]
+
+
+def test_ambiguous_vendored_contracts(write_contracts, capsys):
+    write_contracts({"A": VALID, "B": "%inherits library\n" + VALID})
+    for directory in ("x", "y"):
+        os.makedirs(f"vendor/{directory}")
+        with open(f"vendor/{directory}/library.cairo", "w") as library:
+            library.write(VALID)
+    set_search_path(["vendor"])
+
+    watcher = ContractWatcher(use_cache=False, workers=1)
+    assert watcher.build_all() == ["A_final"]
+    # only reported for the target resolving the ambiguous name
+    output = capsys.readouterr().out
+    assert "could not flatten B" in output
+    assert "Ambiguous contract name library" in output
+    assert "could not flatten A" not in output
@@ -0,0 +1,70 @@
+"""
+Tree shaking of a flattened contract.
+
+The entry points of a contract (constructor, external and view functions) are
+always kept. The internal functions, consts, structs and storage vars are only
+kept when they are reachable from an entry point:
+
+entry points -> identifiers of their text -> entries of that name -> ...
+
+References are found by name over the text of the entries (comments
+excluded), so a name that is only mentioned, for instance as a local
+variable, also keeps the entry of that name.
+"""
+
+import re
+
+from model import Contract
+from sources import materialize
+
+# sections of the contract pruned by reachability, in the order they are checked
+SHAKEN_SECTIONS = ("func", "const", "structs", "storage")
+
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+COMMENT = re.compile(r"#[^\n]*")
+
+
+def get_references(entry) -> set:
+    """
+    Identifiers used in the text of an entry.
+    """
+    return set(IDENTIFIER.findall(COMMENT.sub("", materialize(entry.span))))
+
+
+def get_entry_points(contract: Contract) -> list:
+    entry_points = list(contract.external) + list(contract.view)
+    if contract.constructor:
+        entry_points.append(contract.constructor)
+    return entry_points
+
+
+def get_reachable_names(contract: Contract) -> set:
+    """
+    Names of the shaken entries reachable from the entry points.
+    """
+    # name -> entries of that name in the shaken sections
+    definitions = dict()
+    for section in SHAKEN_SECTIONS:
+        for entry in getattr(contract, section):
+            definitions.setdefault(entry.name, []).append(entry)
+
+    reachable = set()
+    to_visit = list(get_entry_points(contract))
+    while to_visit:
+        for name in get_references(to_visit.pop()):
+            if name in definitions and name not in reachable:
+                reachable.add(name)
+                to_visit.extend(definitions[name])
+    return reachable
+
+
+def shake_contract(contract: Contract) -> Contract:
+    """
+    Flattened contract without its unreachable internal functions, consts,
+    structs and storage vars. The contract given is left unchanged.
+    """
+    reachable = get_reachable_names(contract)
+    return contract.replace(**{
+        section: tuple(entry for entry in getattr(contract, section) if entry.name in reachable)
+        for section in SHAKEN_SECTIONS
+    })
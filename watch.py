@@ -0,0 +1,167 @@
+"""
+Watch the search path and re-flatten the contracts affected by a change.
+
+Parsed contracts and the reverse inheritance graph (contract -> contracts
+inheriting from it, built from the headers) are kept in memory. Changes are
+detected by polling the modification times of the .cairo files of the search
+path, whose index is rebuilt at each poll. When a
+contract changes only that contract is parsed again, and only the leaf
+contracts that transitively inherit from it are merged and written again.
+"""
+
+import os
+from time import sleep
+
+from commons import CONTRACTS_DIRECTORY
+from batch import (
+    build_target,
+    get_contributing_contracts,
+    parse_all_contracts,
+    read_headers,
+)
+from parse_cairo_contract import parse_cairo_header
+from manifest import load_manifest, save_manifest
+from search_path import ambiguous_contracts, build_index, get_project_contracts, get_search_path
+
+
+def scan_mtimes() -> dict:
+    """
+    Path and modification time of every contract of the search path by name.
+    Ambiguous names are left out, their resolution only fails for the targets
+    inheriting from them.
+    """
+    mtimes = dict()
+    for name, path in build_index().items():
+        if name in ambiguous_contracts:
+            continue
+        try:
+            mtimes[name] = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            # removed since the index was built
+            continue
+    return mtimes
+
+
+class ContractWatcher:
+    def __init__(self, use_cache: bool = True, workers: int = None, tree_shake: bool = False):
+        self.use_cache = use_cache
+        self.workers = workers
+        self.tree_shake = tree_shake
+        self.mtimes = scan_mtimes()
+        # only the contracts of CONTRACTS_DIRECTORY are flattened
+        self.project_contracts = set(get_project_contracts())
+        # the graph is kept from the headers, bodies are parsed when a target needs them
+        self.headers = read_headers(sorted(self.mtimes))
+        self.parsed_contracts = dict()
+        self.manifest = load_manifest()
+        # contract name -> names of the contracts directly inheriting from it
+        self.children = dict()
+        for name, header in self.headers.items():
+            self.add_edges(name, header)
+
+    def add_edges(self, name: str, header: dict):
+        for parent in header["inherits"]:
+            self.children.setdefault(parent, set()).add(name)
+
+    def remove_edges(self, name: str, header: dict):
+        for parent in header["inherits"]:
+            self.children.get(parent, set()).discard(name)
+
+    def descendants(self, names) -> set:
+        """
+        The given contracts and every contract transitively inheriting from them.
+        """
+        found = set(names)
+        stack = list(names)
+        while stack:
+            for child in self.children.get(stack.pop(), ()):
+                if child not in found:
+                    found.add(child)
+                    stack.append(child)
+        return found
+
+    def is_leaf(self, name: str) -> bool:
+        return (
+            name in self.headers
+            and name in self.project_contracts
+            and not self.children.get(name)
+        )
+
+    def build(self, targets) -> list:
+        targets = sorted(targets)
+        try:
+            # parse what the targets need up front, in parallel
+            to_parse = get_contributing_contracts(targets, self.headers)
+            to_parse -= self.parsed_contracts.keys()
+            self.parsed_contracts.update(
+                parse_all_contracts(sorted(to_parse), self.workers, self.use_cache)
+            )
+        except Exception:
+            # reported for each target below
+            pass
+
+        # merged ancestors shared by several targets are only merged once,
+        # and their sources only hashed once
+        merged_bases = dict()
+        file_hashes = dict()
+        written = list()
+        for target in targets:
+            try:
+                name = build_target(
+                    target,
+                    self.parsed_contracts,
+                    self.use_cache,
+                    self.headers,
+                    self.manifest,
+                    self.tree_shake,
+                    merged_bases,
+                    file_hashes,
+                )
+            except Exception as error:
+                # a contract being edited may be invalid, the watcher keeps running
+                print(f"could not flatten {target}: {error!r}")
+                continue
+            if name:
+                written.append(name)
+        save_manifest(self.manifest)
+        return written
+
+    def build_all(self) -> list:
+        return self.build(name for name in self.headers if self.is_leaf(name))
+
+    def poll(self) -> list:
+        """
+        Forget the parse of the changed contracts and re-flatten the leaf
+        contracts affected by them, returns the names of the written contracts.
+        """
+        mtimes = scan_mtimes()
+        changed = [name for name in mtimes if self.mtimes.get(name) != mtimes[name]]
+        removed = [name for name in self.mtimes if name not in mtimes]
+        self.mtimes = mtimes
+        self.project_contracts = set(get_project_contracts())
+        if not changed and not removed:
+            return []
+
+        for name in removed + changed:
+            self.parsed_contracts.pop(name, None)
+            if name in self.headers:
+                self.remove_edges(name, self.headers.pop(name))
+        for name in changed:
+            try:
+                self.headers[name] = parse_cairo_header(name)
+            except Exception as error:
+                print(f"could not read {name}: {error!r}")
+                continue
+            self.add_edges(name, self.headers[name])
+
+        affected = self.descendants(changed + removed)
+        return self.build(name for name in affected if self.is_leaf(name))
+
+    def run(self, interval: float = 0.5):
+        for name in self.build_all():
+            print(f"{CONTRACTS_DIRECTORY}/{name}.cairo")
+        print(f"watching {', '.join(get_search_path())} for changes")
+        while True:
+            sleep(interval)
+            for name in self.poll():
+                print(f"{CONTRACTS_DIRECTORY}/{name}.cairo")
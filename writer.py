@@ -1,46 +1,180 @@
-from json import dump
+import os
+import marshal
+from contextlib import contextmanager
+from json import dumps, load
+from tempfile import NamedTemporaryFile
 from commons import CONTRACTS_DIRECTORY, ARTIFACTS_DIRECTORY
 from pathlib import Path
+from sources import materialize
+from model import Contract
 
-def write_artifact(contract_dict : dict, contract_name : str):
+# buffer of the file handles the outputs are streamed to
+WRITE_BUFFER_SIZE = 1 << 16
+
+# format of the artifacts, JSON to be read by humans or the compact binary format
+JSON_FORMAT = "json"
+BINARY_FORMAT = "binary"
+ARTIFACT_EXTENSIONS = {JSON_FORMAT: "json", BINARY_FORMAT: "bin"}
+artifact_format = JSON_FORMAT
+
+# binary artifacts are this magic followed by marshal.dumps((BINARY_VERSION, Contract.to_tuple()))
+BINARY_MAGIC = b"CAIRO-INHERITANCE\0"
+BINARY_VERSION = 1
+
+def set_artifact_format(format : str) -> None:
+    global artifact_format
+    if format not in ARTIFACT_EXTENSIONS:
+        raise ValueError(f"Unknown artifact format {format}")
+    artifact_format = format
+
+def get_artifact_format() -> str:
+    return artifact_format
+
+def get_artifact_path(contract_name : str) -> str:
+    return f"{ARTIFACTS_DIRECTORY}/{contract_name}.{ARTIFACT_EXTENSIONS[artifact_format]}"
+
+def write_artifact(contract : Contract, contract_name : str) -> bool:
     Path(f"{ARTIFACTS_DIRECTORY}").mkdir(parents=True, exist_ok=True)
-    with open(f"{ARTIFACTS_DIRECTORY}/{contract_name}.json", 'w') as file:
-        dump(contract_dict, file)
+    if artifact_format == BINARY_FORMAT:
+        # marshal writes the interned strings once and refers to them after
+        data = BINARY_MAGIC + marshal.dumps((BINARY_VERSION, contract.to_tuple()))
+        return write_if_changed(get_artifact_path(contract_name), data)
+    # the artifact of a single contract is small, dumps uses the C encoder in one shot
+    return write_if_changed(get_artifact_path(contract_name), dumps(contract.to_dict()))
+
+def write_if_changed(path : str, text) -> bool:
+    """
+    Write text, or bytes, to path unless the file already holds it, so that
+    unchanged files keep their modification time. Returns whether the file
+    was written.
+    """
+    return stream_if_changed(path, lambda: (text,), binary=isinstance(text, bytes))
+
+def stream_if_changed(path : str, get_chunks, binary : bool = False) -> bool:
+    """
+    Write the chunks of text given by get_chunks() to path, atomically, unless
+    the file already holds them. get_chunks is called once to compare the
+    chunks with the file and once more to write them, the whole text is never
+    held in memory. Returns whether the file was written.
+    """
+    if file_holds(path, get_chunks(), binary):
+        return False
+    with open_atomic(path, binary) as file:
+        file.writelines(get_chunks())
+    return True
+
+def file_holds(path : str, chunks, binary : bool = False) -> bool:
+    # compare the file with the chunks as they come, stopping at the first difference
+    try:
+        with open(path, "rb" if binary else "r") as file:
+            for chunk in chunks:
+                if file.read(len(chunk)) != chunk:
+                    return False
+            return not file.read(1)
+    except OSError:
+        return False
+
+@contextmanager
+def open_atomic(path : str, binary : bool = False):
+    """
+    Buffered handle to a temporary file next to path, renamed to path once
+    closed so that readers only ever see the previous or the complete file.
+    """
+    directory, name = os.path.split(path)
+    file = NamedTemporaryFile(
+        "wb" if binary else "w", dir=directory or ".", prefix=f".{name}.", suffix=".tmp", delete=False,
+        buffering=WRITE_BUFFER_SIZE,
+    )
+    try:
+        with file:
+            yield file
+        # keep the permissions of the replaced file, or the default ones of a new file
+        if os.path.exists(path):
+            os.chmod(file.name, os.stat(path).st_mode & 0o7777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(file.name, 0o666 & ~umask)
+        os.replace(file.name, path)
+    except BaseException:
+        os.unlink(file.name)
+        raise
+
+def read_artifact(contract_name : str) -> Contract:
+    """
+    Read back the artifact of a contract, None if missing or unreadable.
+    """
+    try:
+        if artifact_format == BINARY_FORMAT:
+            with open(get_artifact_path(contract_name), "rb") as file:
+                data = file.read()
+            if not data.startswith(BINARY_MAGIC):
+                return None
+            version, contract = marshal.loads(memoryview(data)[len(BINARY_MAGIC):])
+            return Contract.from_tuple(contract) if version == BINARY_VERSION else None
+        with open(get_artifact_path(contract_name)) as file:
+            return Contract.from_dict(load(file))
+    except (OSError, ValueError, EOFError, TypeError, KeyError):
+        return None
+
+def write_contract(merged_contract : Contract, contract_name : str) -> bool:
+    """
+    Stream the final contract to a file, unless it is unchanged. Returns
+    whether the file was written.
+    """
+    contract_path = f"{CONTRACTS_DIRECTORY}/{contract_name}.cairo"
+    return stream_if_changed(contract_path, lambda: iter_contract(merged_contract))
+
+def render_contract(merged_contract : Contract) -> str:
+    """
+    Text of the final contract.
+    """
+    return "".join(iter_contract(merged_contract))
+
+def iter_contract(merged_contract : Contract):
+    """
+    Chunks of text of the final contract, the parts of iter_parts separated by
+    newlines.
+    """
+    parts = iter_parts(merged_contract)
+    yield next(parts)
+    for part in parts:
+        yield "\n"
+        yield part
 
-def write_contract(contract_dict : dict, contract_name : str) -> None:
+def iter_parts(merged_contract : Contract):
     """
-    Write the final contract to a file.
+    Parts of the final contract in order, the text of the entries is only
+    materialized from their spans here, one entry at a time.
     """
-    contract = []
     #start with lang
-    contract.append(f"%lang {contract_dict['lang'][0]}") #starknet lang is always first anyways
+    if not merged_contract.lang:
+        raise ValueError(f"Contract {merged_contract.path} has no %lang header")
+    yield f"%lang {merged_contract.lang[0]}" #starknet lang is always first anyways
     #follow with builtins
-    contract.append(f"%builtins {' '.join(contract_dict['builtin'])}\n")
+    yield f"%builtins {' '.join(merged_contract.builtin)}\n"
     #follow with imports
-    for import_ in contract_dict['imports']:
-        module = list(import_.keys())[0] #should only be one key
-        contract.append(f"from {module} import {','.join(import_[module])}")
-    contract.append("\n") #separate imports from rest of code
+    for import_ in merged_contract.imports:
+        yield f"from {import_.module} import {','.join(import_.names)}"
+    yield "\n" #separate imports from rest of code
     #follow with structs
-    for struct in contract_dict['structs']:
-        contract.append(f"{struct['raw_text']}\n")
+    for struct in merged_contract.structs:
+        yield f"{materialize(struct.span)}\n"
     #follow with storage
-    for storage in contract_dict['storage']:
-        contract.append(f"{storage['raw_text']}\n")
+    for storage in merged_contract.storage:
+        yield f"{materialize(storage.span)}\n"
     #follow with const
-    for const in contract_dict['const']:
-        contract.append(f"{const['raw_text']}\n")
-    #follow with constructor
-    contract.append(f"{contract_dict['constructor']['raw_text']}\n")
+    for const in merged_contract.const:
+        yield f"{materialize(const.span)}\n"
+    #follow with constructor, if any
+    if merged_contract.constructor:
+        yield f"{materialize(merged_contract.constructor.span)}\n"
     #follow with external functions
-    for external in contract_dict['external']:
-        contract.append(f"{external['raw_text']}\n")
+    for external in merged_contract.external:
+        yield f"{materialize(external.span)}\n"
     #follow with view functions
-    for external in contract_dict['view']:
-        contract.append(f"{external['raw_text']}\n")
+    for external in merged_contract.view:
+        yield f"{materialize(external.span)}\n"
     #follow with internal functions
-    for internal in contract_dict['func']:
-        contract.append(f"{internal['raw_text']}\n")
-    #write final file
-    with open(f"{CONTRACTS_DIRECTORY}/{contract_name}.cairo", 'w') as f:
-        f.writelines("\n".join(contract))
+    for internal in merged_contract.func:
+        yield f"{materialize(internal.span)}\n"